@@ -17,28 +17,32 @@ from dotenv import load_dotenv
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent
 load_dotenv(_PROJECT_ROOT / ".env")
 
+# Environment snapshot taken once after .env is loaded; Config reads from this
+# instead of hitting os.environ per field. Refresh with Config.reload().
+_ENV: dict[str, str] = dict(os.environ)
+
 
 def _auto_detect_provider() -> str:
     """Pick the best available provider based on which keys exist."""
-    explicit = os.getenv("DIABLO_AI_PROVIDER", "").strip().lower()
+    explicit = _ENV.get("DIABLO_AI_PROVIDER", "").strip().lower()
     if explicit:
         return explicit
 
     # Auto-detect from available keys (priority: openrouter > gemini > openai > anthropic)
-    if os.getenv("OPENROUTER_API_KEY"):
+    if _ENV.get("OPENROUTER_API_KEY"):
         return "openrouter"
-    if os.getenv("GEMINI_API_KEY"):
+    if _ENV.get("GEMINI_API_KEY"):
         return "gemini"
-    if os.getenv("OPENAI_API_KEY"):
+    if _ENV.get("OPENAI_API_KEY"):
         return "openai"
-    if os.getenv("ANTHROPIC_API_KEY"):
+    if _ENV.get("ANTHROPIC_API_KEY"):
         return "anthropic"
     return "gemini"  # default — free tier friendly
 
 
 def _auto_detect_model(provider: str) -> str:
     """Pick default model for the detected provider."""
-    explicit = os.getenv("DIABLO_AI_MODEL", "").strip()
+    explicit = _ENV.get("DIABLO_AI_MODEL", "").strip()
     if explicit:
         return explicit
 
@@ -50,45 +54,92 @@ def _auto_detect_model(provider: str) -> str:
     }.get(provider, "gemini-2.0-flash")
 
 
+def _auto_detect_fast_model(provider: str) -> str:
+    """Pick the cheap model used for short prompts ("" disables routing)."""
+    if _ENV.get("DIABLO_ROUTER", "on").strip().lower() == "off":
+        return ""
+    explicit = _ENV.get("DIABLO_AI_FAST_MODEL", "").strip()
+    if explicit:
+        return explicit
+    if _ENV.get("DIABLO_AI_MODEL", "").strip():
+        return ""  # respect an explicitly pinned model
+
+    return {
+        "openrouter": "openai/gpt-oss-20b:free",
+        "gemini": "gemini-2.0-flash-lite",
+        "openai": "gpt-4o-mini",
+        "anthropic": "claude-3-5-haiku-latest",
+    }.get(provider, "")
+
+
 @dataclass(frozen=True)
 class Config:
     """Immutable application configuration."""
 
     # Solodit
     cyfrin_api_key: str = field(
-        default_factory=lambda: os.getenv("CYFRIN_API_KEY", "")
+        default_factory=lambda: _ENV.get("CYFRIN_API_KEY", "")
     )
     solodit_api_url: str = "https://solodit.cyfrin.io/api/v1/solodit/findings"
 
     # AI Provider (auto-detected if not explicit)
     ai_provider: str = field(default_factory=_auto_detect_provider)
     openai_api_key: str = field(
-        default_factory=lambda: os.getenv("OPENAI_API_KEY", "")
+        default_factory=lambda: _ENV.get("OPENAI_API_KEY", "")
     )
     anthropic_api_key: str = field(
-        default_factory=lambda: os.getenv("ANTHROPIC_API_KEY", "")
+        default_factory=lambda: _ENV.get("ANTHROPIC_API_KEY", "")
     )
     gemini_api_key: str = field(
-        default_factory=lambda: os.getenv("GEMINI_API_KEY", "")
+        default_factory=lambda: _ENV.get("GEMINI_API_KEY", "")
     )
     openrouter_api_key: str = field(
-        default_factory=lambda: os.getenv("OPENROUTER_API_KEY", "")
+        default_factory=lambda: _ENV.get("OPENROUTER_API_KEY", "")
     )
     ai_model: str = field(default_factory=lambda: "")  # resolved post-init
+    ai_fast_model: str = field(default_factory=lambda: "")  # resolved post-init
+
+    # Seconds before a slow pitfall/fix-draft AI call is re-issued (0 disables)
+    ai_hedge_after: float = field(
+        default_factory=lambda: float(_ENV.get("DIABLO_AI_HEDGE_AFTER", "0"))
+    )
 
     # Server
-    host: str = field(default_factory=lambda: os.getenv("DIABLO_HOST", "127.0.0.1"))
-    port: int = field(default_factory=lambda: int(os.getenv("DIABLO_PORT", "8391")))
+    host: str = field(default_factory=lambda: _ENV.get("DIABLO_HOST", "127.0.0.1"))
+    port: int = field(default_factory=lambda: int(_ENV.get("DIABLO_PORT", "8391")))
+    # Auto-reload on source changes (python -m backend.server); for development
+    auto_reload: bool = field(
+        default_factory=lambda: _ENV.get("DIABLO_RELOAD", "off").strip().lower() == "on"
+    )
 
     # Paths
     cache_dir: Path = field(
         default_factory=lambda: _PROJECT_ROOT / ".cache"
     )
+    # Connection pool size for each outbound HTTP client (Solodit, AI SDKs)
+    http_max_connections: int = field(
+        default_factory=lambda: int(_ENV.get("DIABLO_HTTP_MAX_CONNECTIONS", "50"))
+    )
+    # Seconds Solodit responses stay in the on-disk cache (0 disables it)
+    solodit_cache_ttl: float = field(
+        default_factory=lambda: float(_ENV.get("DIABLO_SOLODIT_CACHE_TTL", "3600"))
+    )
 
     def __post_init__(self) -> None:
         # Resolve model after provider is known
         if not self.ai_model:
             object.__setattr__(self, "ai_model", _auto_detect_model(self.ai_provider))
+        if not self.ai_fast_model:
+            object.__setattr__(
+                self, "ai_fast_model", _auto_detect_fast_model(self.ai_provider)
+            )
+
+    @classmethod
+    def reload(cls) -> Config:
+        """Re-snapshot the environment and build a fresh Config (used by tests)."""
+        global _ENV
+        _ENV = dict(os.environ)
+        return cls()
 
     def validate(self) -> list[str]:
         """Return a list of missing-but-required config keys."""
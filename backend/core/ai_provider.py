@@ -7,22 +7,113 @@ configured provider. Supports streaming for interactive UX.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import re
-from typing import AsyncIterator
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+import httpx
 
 from backend.config import config
+from backend.core.http import SSL_CONTEXT, pool_limits
+
+# Provider SDKs are imported once at module load. A missing SDK only disables
+# the provider that needs it instead of breaking startup.
+try:
+    import openai
+except ImportError:  # pragma: no cover - optional at runtime
+    openai = None
+
+try:
+    import anthropic
+except ImportError:  # pragma: no cover - optional at runtime
+    anthropic = None
+
+try:
+    from google import genai
+    from google.genai import types as genai_types
+except ImportError:  # pragma: no cover - optional at runtime
+    genai = None
+    genai_types = None
 
 logger = logging.getLogger(__name__)
 
 
+def _sdk_errors(name: str) -> tuple[type[BaseException], ...]:
+    """The exception class *name* from every installed OpenAI-style SDK."""
+    return tuple(
+        getattr(sdk, name) for sdk in (openai, anthropic) if sdk is not None and hasattr(sdk, name)
+    )
+
+
+# Typed provider failures, so callers can map errors without parsing messages
+RATE_LIMIT_ERRORS = _sdk_errors("RateLimitError")
+AUTH_ERRORS = _sdk_errors("AuthenticationError") + _sdk_errors("PermissionDeniedError")
+TIMEOUT_ERRORS = (httpx.TimeoutException, asyncio.TimeoutError) + _sdk_errors("APITimeoutError")
+
+_OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+# ```html ... ``` or ``` ... ``` wrapped around a whole response
+_FENCE_RE = re.compile(r"^```(?:html|xml)?\s*\n(.*?)\n?```\s*$", re.DOTALL)
+
+# Requests this small are routed to the fast tier model.
+_FAST_MAX_TOKENS = 512
+_FAST_MAX_PROMPT_CHARS = 4000
+
+# SDK clients are costly to build (SSL context + connection pool each), so keep
+# one per (provider, api_key) for the lifetime of the process.
+_clients: dict[tuple[str, str], Any] = {}
+
+
+def _get_client(provider: str, api_key: str) -> Any:
+    """Return the cached SDK client for *provider*, creating it on first use."""
+    key = (provider, api_key)
+    client = _clients.get(key)
+    if client is None:
+        client = _clients[key] = _new_client(provider, api_key)
+    return client
+
+
+def _new_client(provider: str, api_key: str) -> Any:
+    if provider in ("openai", "openrouter"):
+        sdk = _require(openai, "openai")
+        return sdk.AsyncOpenAI(
+            api_key=api_key,
+            base_url=_OPENROUTER_BASE_URL if provider == "openrouter" else None,
+            http_client=sdk.DefaultAsyncHttpxClient(verify=SSL_CONTEXT, limits=pool_limits()),
+        )
+    if provider == "anthropic":
+        sdk = _require(anthropic, "anthropic")
+        return sdk.AsyncAnthropic(
+            api_key=api_key,
+            http_client=sdk.DefaultAsyncHttpxClient(verify=SSL_CONTEXT, limits=pool_limits()),
+        )
+    if provider == "gemini":
+        return _require(genai, "google-genai").Client(
+            api_key=api_key,
+            http_options=genai_types.HttpOptions(async_client_args={"verify": SSL_CONTEXT}),
+        )
+    raise ValueError(f"Unknown AI provider: {provider}")
+
+
+def _require(sdk: Any, package: str) -> Any:
+    if sdk is None:
+        raise RuntimeError(f"AI provider SDK is not installed: pip install {package}")
+    return sdk
+
+
 class AIProvider:
     """Unified interface for LLM calls — OpenAI, Anthropic, or Gemini."""
 
     def __init__(self) -> None:
         self._provider = config.ai_provider
         self._model = config.ai_model
-        logger.info("AI Provider: %s (model: %s)", self._provider, self._model)
+        self._fast_model = config.ai_fast_model
+        self._hedge_after = config.ai_hedge_after
+        logger.info(
+            "AI Provider: %s (model: %s, fast: %s)",
+            self._provider, self._model, self._fast_model or "off",
+        )
 
     async def generate(
         self,
@@ -31,20 +122,83 @@ class AIProvider:
         *,
         temperature: float = 0.7,
         max_tokens: int = 4096,
+        on_chunk: Callable[[str], Awaitable[None]] | None = None,
     ) -> str:
-        """Generate a completion (non-streaming)."""
+        """Generate a completion.
+
+        With *on_chunk*, the completion is streamed and each chunk is passed
+        to it as it arrives; the full text is still returned.
+        """
+        if on_chunk is not None:
+            parts: list[str] = []
+            async for chunk in self.stream(
+                system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens
+            ):
+                parts.append(chunk)
+                await on_chunk(chunk)
+            return self._strip_fences("".join(parts))
+
+        model = self._route(system_prompt, user_prompt, max_tokens)
+        args = (model, system_prompt, user_prompt, temperature, max_tokens)
         if self._provider == "openai":
-            result = await self._openai(system_prompt, user_prompt, temperature, max_tokens)
+            result = await self._openai(*args)
         elif self._provider == "anthropic":
-            result = await self._anthropic(system_prompt, user_prompt, temperature, max_tokens)
+            result = await self._anthropic(*args)
         elif self._provider == "gemini":
-            result = await self._gemini(system_prompt, user_prompt, temperature, max_tokens)
+            result = await self._gemini(*args)
         elif self._provider == "openrouter":
-            result = await self._openrouter(system_prompt, user_prompt, temperature, max_tokens)
+            result = await self._openrouter(*args)
         else:
             raise ValueError(f"Unknown AI provider: {self._provider}")
         return self._strip_fences(result)
 
+    async def generate_hedged(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        temperature: float = 0.7,
+        max_tokens: int = 4096,
+    ) -> str:
+        """Like :meth:`generate`, but re-issue the request if it runs slow.
+
+        If no answer has arrived after ``DIABLO_AI_HEDGE_AFTER`` seconds, an
+        identical second request is sent and whichever succeeds first wins;
+        the other is cancelled. Disabled (plain ``generate``) when that is 0.
+        """
+        def attempt() -> asyncio.Task[str]:
+            return asyncio.create_task(
+                self.generate(
+                    system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens
+                )
+            )
+
+        if self._hedge_after <= 0:
+            return await attempt()
+
+        pending = {attempt()}
+        error: BaseException | None = None
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self._hedge_after)
+            if not done:
+                logger.info("AI call slower than %.1fs, sending hedge request", self._hedge_after)
+                pending.add(attempt())
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = error or task.exception()
+                if not pending:
+                    assert error is not None
+                    raise error
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
     async def stream(
         self,
         system_prompt: str,
@@ -54,24 +208,25 @@ class AIProvider:
         max_tokens: int = 4096,
     ) -> AsyncIterator[str]:
         """Stream a completion token-by-token."""
+        model = self._route(system_prompt, user_prompt, max_tokens)
         if self._provider == "openai":
             async for chunk in self._openai_stream(
-                system_prompt, user_prompt, temperature, max_tokens
+                model, system_prompt, user_prompt, temperature, max_tokens
             ):
                 yield chunk
         elif self._provider == "anthropic":
             async for chunk in self._anthropic_stream(
-                system_prompt, user_prompt, temperature, max_tokens
+                model, system_prompt, user_prompt, temperature, max_tokens
             ):
                 yield chunk
         elif self._provider == "gemini":
             async for chunk in self._gemini_stream(
-                system_prompt, user_prompt, temperature, max_tokens
+                model, system_prompt, user_prompt, temperature, max_tokens
             ):
                 yield chunk
         elif self._provider == "openrouter":
             async for chunk in self._openrouter_stream(
-                system_prompt, user_prompt, temperature, max_tokens
+                model, system_prompt, user_prompt, temperature, max_tokens
             ):
                 yield chunk
         else:
@@ -81,12 +236,27 @@ class AIProvider:
     # Utilities
     # ------------------------------------------------------------------
 
+    def _route(self, system: str, user: str, max_tokens: int) -> str:
+        """Pick the model for a request.
+
+        Short prompts with a small answer budget (summaries, one-liners) go to
+        the fast tier; everything else uses the configured flagship model.
+        """
+        if (
+            self._fast_model
+            and max_tokens <= _FAST_MAX_TOKENS
+            and len(system) + len(user) <= _FAST_MAX_PROMPT_CHARS
+        ):
+            return self._fast_model
+        return self._model
+
     @staticmethod
     def _strip_fences(text: str) -> str:
         """Strip markdown code fences that LLMs often wrap HTML in."""
         stripped = text.strip()
-        # Remove ```html ... ``` or ``` ... ```
-        m = re.match(r"^```(?:html|xml)?\s*\n(.*?)\n?```\s*$", stripped, re.DOTALL)
+        if not stripped.startswith("```"):
+            return stripped
+        m = _FENCE_RE.match(stripped)
         if m:
             return m.group(1).strip()
         return stripped
@@ -96,13 +266,11 @@ class AIProvider:
     # ------------------------------------------------------------------
 
     async def _openai(
-        self, system: str, user: str, temperature: float, max_tokens: int
+        self, model: str, system: str, user: str, temperature: float, max_tokens: int
     ) -> str:
-        from openai import AsyncOpenAI
-
-        client = AsyncOpenAI(api_key=config.openai_api_key)
+        client = _get_client("openai", config.openai_api_key)
         response = await client.chat.completions.create(
-            model=self._model,
+            model=model,
             messages=[
                 {"role": "system", "content": system},
                 {"role": "user", "content": user},
@@ -113,13 +281,11 @@ class AIProvider:
         return response.choices[0].message.content or ""
 
     async def _openai_stream(
-        self, system: str, user: str, temperature: float, max_tokens: int
+        self, model: str, system: str, user: str, temperature: float, max_tokens: int
     ) -> AsyncIterator[str]:
-        from openai import AsyncOpenAI
-
-        client = AsyncOpenAI(api_key=config.openai_api_key)
+        client = _get_client("openai", config.openai_api_key)
         stream = await client.chat.completions.create(
-            model=self._model,
+            model=model,
             messages=[
                 {"role": "system", "content": system},
                 {"role": "user", "content": user},
@@ -138,13 +304,11 @@ class AIProvider:
     # ------------------------------------------------------------------
 
     async def _anthropic(
-        self, system: str, user: str, temperature: float, max_tokens: int
+        self, model: str, system: str, user: str, temperature: float, max_tokens: int
     ) -> str:
-        import anthropic
-
-        client = anthropic.AsyncAnthropic(api_key=config.anthropic_api_key)
+        client = _get_client("anthropic", config.anthropic_api_key)
         message = await client.messages.create(
-            model=self._model,
+            model=model,
             system=system,
             messages=[{"role": "user", "content": user}],
             temperature=temperature,
@@ -153,13 +317,11 @@ class AIProvider:
         return message.content[0].text
 
     async def _anthropic_stream(
-        self, system: str, user: str, temperature: float, max_tokens: int
+        self, model: str, system: str, user: str, temperature: float, max_tokens: int
     ) -> AsyncIterator[str]:
-        import anthropic
-
-        client = anthropic.AsyncAnthropic(api_key=config.anthropic_api_key)
+        client = _get_client("anthropic", config.anthropic_api_key)
         async with client.messages.stream(
-            model=self._model,
+            model=model,
             system=system,
             messages=[{"role": "user", "content": user}],
             temperature=temperature,
@@ -173,16 +335,11 @@ class AIProvider:
     # ------------------------------------------------------------------
 
     async def _openrouter(
-        self, system: str, user: str, temperature: float, max_tokens: int
+        self, model: str, system: str, user: str, temperature: float, max_tokens: int
     ) -> str:
-        from openai import AsyncOpenAI
-
-        client = AsyncOpenAI(
-            api_key=config.openrouter_api_key,
-            base_url="https://openrouter.ai/api/v1",
-        )
+        client = _get_client("openrouter", config.openrouter_api_key)
         response = await client.chat.completions.create(
-            model=self._model,
+            model=model,
             messages=[
                 {"role": "system", "content": system},
                 {"role": "user", "content": user},
@@ -194,16 +351,11 @@ class AIProvider:
         return response.choices[0].message.content or ""
 
     async def _openrouter_stream(
-        self, system: str, user: str, temperature: float, max_tokens: int
+        self, model: str, system: str, user: str, temperature: float, max_tokens: int
     ) -> AsyncIterator[str]:
-        from openai import AsyncOpenAI
-
-        client = AsyncOpenAI(
-            api_key=config.openrouter_api_key,
-            base_url="https://openrouter.ai/api/v1",
-        )
+        client = _get_client("openrouter", config.openrouter_api_key)
         stream = await client.chat.completions.create(
-            model=self._model,
+            model=model,
             messages=[
                 {"role": "system", "content": system},
                 {"role": "user", "content": user},
@@ -223,17 +375,14 @@ class AIProvider:
     # ------------------------------------------------------------------
 
     async def _gemini(
-        self, system: str, user: str, temperature: float, max_tokens: int
+        self, model: str, system: str, user: str, temperature: float, max_tokens: int
     ) -> str:
-        from google import genai
-        from google.genai import types
-
-        client = genai.Client(api_key=config.gemini_api_key)
+        client = _get_client("gemini", config.gemini_api_key)
 
         response = await client.aio.models.generate_content(
-            model=self._model,
+            model=model,
             contents=user,
-            config=types.GenerateContentConfig(
+            config=genai_types.GenerateContentConfig(
                 system_instruction=system,
                 temperature=temperature,
                 max_output_tokens=max_tokens,
@@ -242,17 +391,14 @@ class AIProvider:
         return response.text or ""
 
     async def _gemini_stream(
-        self, system: str, user: str, temperature: float, max_tokens: int
+        self, model: str, system: str, user: str, temperature: float, max_tokens: int
     ) -> AsyncIterator[str]:
-        from google import genai
-        from google.genai import types
-
-        client = genai.Client(api_key=config.gemini_api_key)
+        client = _get_client("gemini", config.gemini_api_key)
 
         response = await client.aio.models.generate_content_stream(
-            model=self._model,
+            model=model,
             contents=user,
-            config=types.GenerateContentConfig(
+            config=genai_types.GenerateContentConfig(
                 system_instruction=system,
                 temperature=temperature,
                 max_output_tokens=max_tokens,
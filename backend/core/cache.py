@@ -0,0 +1,147 @@
+"""
+In-process result caches.
+
+A bounded LRU mapping with per-entry expiry, plus an async ``get_or_set``
+that collapses concurrent misses on the same key into one upstream call,
+and a small on-disk byte cache that survives restarts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import itertools
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class TTLCache(Generic[T]):
+    """LRU cache whose entries expire *ttl* seconds after they are stored.
+
+    ``None`` is treated as "not cached", so it cannot be stored as a value.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, T]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> T | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: T) -> None:
+        self._data[key] = (time.monotonic() + self._ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    async def get_or_set(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """Return the cached value for *key*, awaiting *factory* on a miss.
+
+        Concurrent callers missing on the same key share a single *factory*
+        call. Failures are propagated to every waiter and not cached.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._settle(key, t))
+        # Shield so one cancelled caller doesn't cancel the fetch for the others.
+        return await asyncio.shield(task)
+
+    def _settle(self, key: Hashable, task: asyncio.Future[T]) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self.set(key, task.result())
+
+
+class DiskCache:
+    """Byte blobs on disk, one file per key, expiring *ttl* seconds after write.
+
+    Expiry uses file mtimes, so entries are shared across processes and
+    restarts. I/O errors are treated as misses: the cache is best-effort.
+    Writes periodically sweep expired files and, past *max_entries*, the
+    oldest ones, so the directory stays bounded.
+    """
+
+    _SWEEP_EVERY = 64  # writes between directory sweeps (the first write sweeps too)
+
+    def __init__(self, directory: Path, ttl: float, max_entries: int = 2048) -> None:
+        self._dir = directory
+        self._ttl = ttl
+        self._max_entries = max_entries
+        # set() runs in worker threads; next() on a count is atomic under the GIL
+        self._writes = itertools.count()
+
+    def _path(self, key: str) -> Path:
+        return self._dir / hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            if path.stat().st_mtime + self._ttl <= time.time():
+                path.unlink(missing_ok=True)
+                return None
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    def set(self, key: str, value: bytes) -> None:
+        try:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            fd, tmp = tempfile.mkstemp(dir=self._dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            return
+        if next(self._writes) % self._SWEEP_EVERY == 0:
+            self.sweep()
+
+    def sweep(self) -> None:
+        """Delete expired entries, then the oldest ones beyond *max_entries*."""
+        cutoff = time.time() - self._ttl
+        live: list[tuple[float, str]] = []
+        try:
+            with os.scandir(self._dir) as it:
+                for entry in it:
+                    try:
+                        mtime = entry.stat().st_mtime
+                        if mtime <= cutoff:
+                            os.unlink(entry.path)
+                        else:
+                            live.append((mtime, entry.path))
+                    except OSError:
+                        continue
+        except OSError:
+            return
+        if len(live) > self._max_entries:
+            live.sort()
+            for _, path in live[: len(live) - self._max_entries]:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
@@ -7,7 +7,12 @@ from raw Solidity source code using regex heuristics.
 
 from __future__ import annotations
 
+import copy
+import hashlib
+import itertools
 import re
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
 
 
@@ -95,11 +100,44 @@ RISK_PATTERNS: dict[str, tuple[str, list[str]]] = {
 }
 
 
+# Compiled once at import. Patterns are matched case-sensitively against a
+# lower-cased copy of the source: equivalent to re.IGNORECASE for these
+# registries, but lets ``re`` use its literal-prefix fast path.
+def _compile(pattern: str) -> re.Pattern[str]:
+    return re.compile(pattern.lower())
+
+
+_FUNCTION_TYPE_RES: tuple[tuple[re.Pattern[str], str], ...] = tuple(
+    (_compile(p), v) for p, v in FUNCTION_TYPE_PATTERNS.items()
+)
+_PROTOCOL_TYPE_RES: tuple[tuple[re.Pattern[str], str], ...] = tuple(
+    (_compile(p), v) for p, v in PROTOCOL_TYPE_PATTERNS.items()
+)
+_RISK_RES: tuple[tuple[re.Pattern[str], str, list[str]], ...] = tuple(
+    (_compile(p), tag, kws) for p, (tag, kws) in RISK_PATTERNS.items()
+)
+
+_FUNCTION_NAME_RE = re.compile(r"function\s+(\w+)")
+# Leading \b: a word-prefixed pattern can only match at a word start, so
+# skip the doomed retries at every position inside each identifier.
+_EXTERNAL_CALL_RE = re.compile(r"\b(\w+)\s*\.\s*(\w+)\s*\(")
+_NON_CALL_RECEIVERS = frozenset({"msg", "block", "tx", "abi", "require", "assert"})
+_MAX_EXTERNAL_CALLS = 10
+_MAX_STATE_CHANGES = 5
+
+# Function/protocol type only need the signature region: on very large inputs
+# classify from the head and tail. Risk patterns still scan everything.
+_SAMPLE_THRESHOLD = 8000
+_SAMPLE_HEAD = 4000
+_SAMPLE_TAIL = 2000
+_STATE_CHANGE_RE = re.compile(r"\b(\w+)\s*(?:=|\+=|-=|\*=|\/=)")
+
+
 # ---------------------------------------------------------------------------
 # Data model
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class CodeContext:
     """Structured context extracted from a Solidity snippet."""
 
@@ -131,47 +169,85 @@ class CodeContext:
 # Analyzer
 # ---------------------------------------------------------------------------
 
+# Recent analyses keyed by a digest of the source, so the cache never holds
+# on to whole files. Shared by every analyzer instance.
+_CACHE_SIZE = 512
+_cache: OrderedDict[bytes, CodeContext] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
 class FunctionAnalyzer:
     """Extract searchable context from Solidity source via regex."""
 
+    def analyze_cached(self, code: str) -> CodeContext:
+        """Like :meth:`analyze`, but memoised on the source text.
+
+        Returns a fresh copy on every call, so callers may mutate it.
+        """
+        key = hashlib.blake2b(code.encode(), digest_size=16).digest()
+        with _cache_lock:
+            ctx = _cache.get(key)
+            if ctx is not None:
+                _cache.move_to_end(key)
+                return copy.deepcopy(ctx)
+
+        ctx = self.analyze(code)
+        with _cache_lock:
+            _cache[key] = ctx
+            if len(_cache) > _CACHE_SIZE:
+                _cache.popitem(last=False)
+        return copy.deepcopy(ctx)
+
     def analyze(self, code: str) -> CodeContext:
         ctx = CodeContext()
+        lowered = code.lower()
 
         # Function name
-        m = re.search(r"function\s+(\w+)", code)
+        m = _FUNCTION_NAME_RE.search(code)
         if m:
             ctx.function_name = m.group(1)
 
+        if len(lowered) > _SAMPLE_THRESHOLD:
+            sample = f"{lowered[:_SAMPLE_HEAD]}\n{lowered[-_SAMPLE_TAIL:]}"
+        else:
+            sample = lowered
+
         # Function type
-        for pattern, func_type in FUNCTION_TYPE_PATTERNS.items():
-            if re.search(pattern, code, re.IGNORECASE):
+        for pattern, func_type in _FUNCTION_TYPE_RES:
+            if pattern.search(sample):
                 ctx.function_type = func_type
                 break
 
         # Protocol type
-        for pattern, proto in PROTOCOL_TYPE_PATTERNS.items():
-            if re.search(pattern, code, re.IGNORECASE):
+        for pattern, proto in _PROTOCOL_TYPE_RES:
+            if pattern.search(sample):
                 ctx.protocol_type = proto
                 break
 
         # Risk patterns
         tags: set[str] = set()
         keywords: set[str] = set()
-        for pattern, (tag, kws) in RISK_PATTERNS.items():
-            if re.search(pattern, code, re.IGNORECASE):
+        for pattern, tag, kws in _RISK_RES:
+            if pattern.search(lowered):
                 ctx.risk_patterns.append(tag)
                 tags.add(tag)
                 keywords.update(kws)
 
-        # External calls
-        for contract, method in re.findall(r"(\w+)\s*\.\s*(\w+)\s*\(", code):
-            if contract not in {"msg", "block", "tx", "abi", "require", "assert"}:
-                ctx.external_calls.append(f"{contract}.{method}")
-        ctx.external_calls = ctx.external_calls[:10]
+        # External calls (stop scanning once the cap is reached)
+        calls = (m.group(1, 2) for m in _EXTERNAL_CALL_RE.finditer(code))
+        ctx.external_calls = list(itertools.islice(
+            (f"{contract}.{method}" for contract, method in calls
+             if contract not in _NON_CALL_RECEIVERS),
+            _MAX_EXTERNAL_CALLS,
+        ))
 
-        # State changes
-        state = re.findall(r"(\w+)\s*(?:=|\+=|-=|\*=|\/=)", code)
-        ctx.state_changes = list(set(state))[:5]
+        # State changes: first distinct targets in source order, stop at the cap
+        state: dict[str, None] = {}
+        for m in _STATE_CHANGE_RE.finditer(code):
+            state[m.group(1)] = None
+            if len(state) >= _MAX_STATE_CHANGES:
+                break
+        ctx.state_changes = list(state)
 
         # Build search suggestions
         ctx.suggested_tags = list(tags)[:3]
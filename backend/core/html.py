@@ -0,0 +1,28 @@
+"""
+Scrubbing for model-generated HTML.
+
+Lessons, reports and fix drafts are rendered in the VS Code webview, so
+the same clean-up applies to all of them.
+"""
+
+from __future__ import annotations
+
+import re
+
+# Inline style attributes (either quote form); they can make text unreadable
+# in dark themes
+STYLE_ATTR_RE = re.compile(r"""\sstyle=(?:"[^"]*"|'[^']*')""", re.IGNORECASE)
+# A <pre><code> block with nothing but whitespace inside
+EMPTY_CODE_RE = re.compile(
+    r"<pre[^>]*>\s*<code[^>]*>\s*</code>\s*</pre>", re.IGNORECASE | re.DOTALL
+)
+
+
+def strip_inline_styles(html: str) -> str:
+    """Remove every inline ``style`` attribute from *html*."""
+    return STYLE_ATTR_RE.sub("", html)
+
+
+def fill_empty_code(html: str, placeholder: str) -> str:
+    """Replace blank code blocks in *html* with one showing *placeholder*."""
+    return EMPTY_CODE_RE.sub(f"<pre><code>{placeholder}</code></pre>", html)
@@ -0,0 +1,26 @@
+"""
+Shared HTTP plumbing.
+
+Building an SSL context reads and parses the CA bundle from disk, so the
+process builds one at import and every outbound HTTP client reuses it.
+Pool limits come from config so every client sizes its keep-alive pool alike.
+"""
+
+from __future__ import annotations
+
+import httpx
+
+from backend.config import config
+
+# Same trust store httpx uses by default (certifi).
+SSL_CONTEXT = httpx.create_ssl_context()
+
+
+def pool_limits() -> httpx.Limits:
+    """Keep-alive pool limits for a long-lived outbound client."""
+    max_connections = max(config.http_max_connections, 1)
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max(max_connections // 2, 1),
+        keepalive_expiry=30.0,
+    )
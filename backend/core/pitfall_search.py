@@ -0,0 +1,232 @@
+"""
+Pitfall Search — Solodit retrieval for a highlighted editor selection.
+
+Shared by /pitfall and /fix-draft: analyses the selection (plus its
+surrounding code), builds selection-first queries, searches Solodit
+concurrently and ranks the findings by relevance to the highlighted name.
+Each endpoint sets its own query budget, but every query is fetched and
+cached at the full page size and trimmed per caller, so /fix-draft after
+/pitfall on the same selection skips Solodit entirely.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from backend.core.cache import TTLCache
+from backend.core.function_analyzer import CodeContext, FunctionAnalyzer
+from backend.core.solodit_client import SearchResult, SoloditClient
+
+logger = logging.getLogger(__name__)
+
+# Everything from the first "(" on, to reduce a selection to its identifier
+_PAREN_TAIL_RE = re.compile(r"\(.*")
+
+# Default queries searched per selection, and findings fetched (and cached)
+# per query; callers may take fewer of either, never more findings
+_MAX_QUERIES = 6
+_PAGE_SIZE = 4
+
+# Extra tokens that make a finding relevant to a "balances" style selection
+_BALANCE_NAMES = frozenset({"balance", "balances", "_balances"})
+_BALANCE_TOKENS = (
+    "accounting",
+    "claim",
+    "double",
+    "share",
+    "totalassets",
+    "totalsupply",
+    "rounding",
+)
+
+
+@dataclass(slots=True)
+class SelectionMatches:
+    """Ranked Solodit findings for one editor selection."""
+
+    ctx: CodeContext
+    sel_name: str  # bare identifier of the selection, e.g. "withdraw"
+    queries: list[str]
+    findings: list[dict[str, Any]]  # best first
+
+    @property
+    def query_used(self) -> str:
+        return self.queries[0] if self.queries else self.sel_name
+
+
+class PitfallSearch:
+    """Find and rank historical findings for a highlighted selection."""
+
+    def __init__(self, client: SoloditClient | None = None) -> None:
+        self._analyzer = FunctionAnalyzer()
+        self._client = client or SoloditClient()
+        # Common identifiers ("transfer", "mint", "balances") repeat across requests
+        self._results: TTLCache[SearchResult] = TTLCache(maxsize=2048, ttl=300)
+
+    async def search_and_score(
+        self,
+        selection: str,
+        surrounding_code: str = "",
+        *,
+        top_k: int = 5,
+        max_queries: int = _MAX_QUERIES,
+        page_size: int = _PAGE_SIZE,
+    ) -> SelectionMatches:
+        """Analyse *selection* and return its *top_k* most relevant findings.
+
+        At most *max_queries* searches are used, keeping the first *page_size*
+        findings of each. Searches always fetch ``_PAGE_SIZE`` findings so the
+        cache serves every budget.
+        """
+        ctx = self._merged_context(selection, surrounding_code)
+        raw_selection = selection.strip()
+        sel_name = _selection_name(raw_selection)
+        queries = _build_queries(raw_selection, sel_name, ctx)
+
+        # Searches run concurrently; results are merged in query order
+        batch = await self._search_all(queries[:max_queries])
+        sel, risks = sel_name.lower(), tuple(r.lower() for r in ctx.risk_patterns[:3])
+        scored: list[tuple[int, dict[str, Any]]] = []
+        seen_keys: set[str] = set()
+        for result in batch:
+            for f in result.findings[:page_size]:
+                # Dedup before serialising; repeats across queries are common
+                if f.key in seen_keys:
+                    continue
+                seen_keys.add(f.key)
+                f_dict = f.to_dict()
+                scored.append((relevance_score(f_dict, sel=sel, risks=risks), f_dict))
+
+        # Same result and tie order as sorting then slicing, without the full sort
+        findings = [f for _, f in heapq.nlargest(top_k, scored, key=lambda it: it[0])]
+        return SelectionMatches(
+            ctx=ctx,
+            sel_name=sel_name,
+            queries=queries,
+            findings=findings,
+        )
+
+    # ------------------------------------------------------------------
+
+    def _merged_context(self, selection: str, surrounding_code: str) -> CodeContext:
+        """Selection context, filled in from the surrounding code.
+
+        The selection wins for the function name; surrounding code only adds
+        protocol and risk information it lacks.
+        """
+        ctx = self._analyzer.analyze_cached(selection)
+        # The webview often sends the same text for both; skip the repeat parse
+        if not surrounding_code or surrounding_code == selection:
+            return ctx
+
+        full_ctx = self._analyzer.analyze_cached(surrounding_code)
+        if not ctx.function_name and full_ctx.function_name:
+            ctx.function_name = full_ctx.function_name
+        if not ctx.protocol_type and full_ctx.protocol_type:
+            ctx.protocol_type = full_ctx.protocol_type
+        for rp in full_ctx.risk_patterns:
+            if rp not in ctx.risk_patterns:
+                ctx.risk_patterns.append(rp)
+        return ctx
+
+    async def _search_all(self, queries: list[str]) -> list[SearchResult]:
+        results = await asyncio.gather(
+            *(self._search(q) for q in queries), return_exceptions=True
+        )
+        batch: list[SearchResult] = []
+        for query, result in zip(queries, results):
+            if isinstance(result, BaseException):
+                logger.warning("Selection search failed for '%s': %s", query, result)
+                continue
+            batch.append(result)
+        return batch
+
+    async def _search(self, query: str) -> SearchResult:
+        # Concurrent identical misses share one upstream call
+        return await self._results.get_or_set(
+            query,
+            lambda: self._client.search(
+                keywords=query,
+                impact=["HIGH", "MEDIUM"],
+                quality_score=2,
+                page_size=_PAGE_SIZE,
+            ),
+        )
+
+
+def _selection_name(raw_selection: str) -> str:
+    """Bare identifier of a selection: ``uint256 _withdraw(x)`` -> ``withdraw``."""
+    name = _PAREN_TAIL_RE.sub("", raw_selection).strip()
+    words = name.split()
+    if words:
+        name = words[-1]
+    return name.lstrip("_")
+
+
+def _build_queries(raw_selection: str, sel_name: str, ctx: CodeContext) -> list[str]:
+    """Selection-specific queries first, then analysis-derived ones, deduplicated."""
+    candidates: list[str] = []
+    if sel_name:
+        candidates.append(sel_name)
+        candidates.append(f"{sel_name} vulnerability")
+    if ctx.function_name and ctx.function_name.lower() != sel_name.lower():
+        candidates.append(ctx.function_name)
+    if ctx.function_type:
+        candidates.append(ctx.function_type)
+    candidates.extend(ctx.risk_patterns[:2])
+    candidates.extend(ctx.suggested_keywords[:3])
+    if raw_selection and raw_selection != sel_name:
+        candidates.append(raw_selection[:120])
+
+    # Strip, drop blanks and case-insensitive repeats, keep order
+    seen: set[str] = set()
+    unique: list[str] = []
+    for q in candidates:
+        q = q.strip()
+        if not q:
+            continue
+        k = q.lower()
+        if k not in seen:
+            seen.add(k)
+            unique.append(q)
+    return unique
+
+
+def relevance_score(finding: dict[str, Any], *, sel: str, risks: tuple[str, ...]) -> int:
+    """Score a finding so the top cards align with the highlighted selection.
+
+    *sel* and *risks* are the lowercased selection name and risk patterns.
+    """
+    title = (finding.get("title") or "").lower()
+    # Only the head of the content is scored, so lowercase just that slice
+    content = (finding.get("content") or "")[:1200].lower()
+    tags = " ".join((finding.get("tags") or [])).lower()
+    haystack = " ".join([title, tags, content])
+
+    score = 0
+    if sel:
+        if sel in title:
+            score += 80
+        if sel in tags:
+            score += 50
+        if sel in haystack:
+            score += 30
+        # Common mapping for "balances" style selections
+        if sel in _BALANCE_NAMES and any(token in haystack for token in _BALANCE_TOKENS):
+            score += 35
+
+    for risk in risks:
+        if risk in haystack:
+            score += 20
+
+    sev = (finding.get("impact") or "").upper()
+    if sev == "HIGH":
+        score += 8
+    elif sev == "MEDIUM":
+        score += 4
+    return score
@@ -0,0 +1,51 @@
+"""
+Prompt files and templates.
+
+Prompt files under ``backend/prompts`` are read once per process. Prompt
+files use ``{name}`` placeholders; templates are split once when loaded
+and rendered with a single join, instead of one full-string
+``str.replace`` pass per placeholder.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import re
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_PROMPTS_DIR = Path(__file__).resolve().parent.parent / "prompts"
+
+_FIELD_RE = re.compile(r"\{(\w+)\}")
+
+
+@functools.lru_cache(maxsize=None)
+def load_prompt(name: str) -> str:
+    """Return the text of ``backend/prompts/<name>`` ("" if it is missing)."""
+    path = _PROMPTS_DIR / name
+    if path.exists():
+        return path.read_text(encoding="utf-8")
+    logger.warning("Prompt file not found: %s", path)
+    return ""
+
+
+class PromptTemplate:
+    """A prompt with ``{name}`` placeholders, filled in one pass.
+
+    Substituted values are never re-scanned, so user input such as a topic
+    containing ``{quiz_count}`` stays literal. Placeholders without a value
+    are left as written.
+    """
+
+    def __init__(self, text: str) -> None:
+        # re.split with one group alternates literal text and field names
+        self._parts = _FIELD_RE.split(text)
+
+    def render(self, **values: object) -> str:
+        parts = self._parts.copy()
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            parts[i] = str(values[name]) if name in values else f"{{{name}}}"
+        return "".join(parts)
@@ -0,0 +1,43 @@
+"""
+Query coalescing.
+
+Collapses near-duplicate search queries ("Oracle" vs "Oracle exploit") so a
+fan-out of Solodit searches doesn't spend requests on the same result set.
+Similarity is the token cosine used by the semantic cache.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+
+from backend.core.semantic_cache import cosine, tokenize
+
+
+def coalesce(queries: list[str], threshold: float = 0.9) -> list[str]:
+    """Return one representative per cluster of similar *queries*.
+
+    Clusters are built greedily in input order against each cluster's first
+    query, and represented by their longest member (the most specific
+    wording). Output keeps the order in which clusters first appear.
+    Queries with no content tokens (only filler words or punctuation) can't
+    be compared by cosine, so they merge on case-insensitive exact text.
+    """
+    clusters: list[tuple[Counter[str], list[str]]] = []
+    verbatim: dict[str, list[str]] = {}
+    for query in queries:
+        bag = tokenize(query)
+        if not bag:
+            key = " ".join(query.lower().split())
+            if key in verbatim:
+                verbatim[key].append(query)
+            else:
+                verbatim[key] = [query]
+                clusters.append((bag, verbatim[key]))
+            continue
+        for seed, members in clusters:
+            if cosine(bag, seed) >= threshold:
+                members.append(query)
+                break
+        else:
+            clusters.append((bag, [query]))
+    return [max(members, key=len) for _, members in clusters]
@@ -0,0 +1,106 @@
+"""
+Semantic cache for LLM outputs.
+
+Reuses a stored answer when a new query is a close paraphrase of a cached
+one ("reentrancy DEX" vs "DEX reentrancy bug"). Similarity is cosine over
+bags of normalized query tokens, with filler words dropped, so no embedding
+model is needed. Entries only match within the same *scope* (prompt inputs
+that must be identical, e.g. lesson depth or the findings being summarised).
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import time
+from collections import Counter, OrderedDict
+from typing import Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Words that don't change what a security query is about
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "attack", "attacks", "bug", "bugs", "exploit", "explain",
+    "for", "how", "in", "is", "issue", "issues", "of", "on", "the", "to", "vuln",
+    "vulnerability", "vulnerabilities", "what", "with",
+})
+
+
+def tokenize(query: str) -> Counter[str]:
+    """Bag of normalized query tokens: lowercased, filler dropped, plurals folded."""
+    bag: Counter[str] = Counter()
+    for tok in _TOKEN_RE.findall(query.lower()):
+        if tok in _STOPWORDS:
+            continue
+        # Cheap plural folding: "vaults" -> "vault", but keep "access"
+        if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+            tok = tok[:-1]
+        bag[tok] += 1
+    return bag
+
+
+def _norm(bag: Counter[str]) -> float:
+    return math.sqrt(sum(n * n for n in bag.values()))
+
+
+def cosine(a: Counter[str], b: Counter[str]) -> float:
+    """Cosine similarity of two token bags (0.0 if either is empty)."""
+    if not a or not b:
+        return 0.0
+    return sum(n * b[tok] for tok, n in a.items()) / (_norm(a) * _norm(b))
+
+
+class SemanticCache(Generic[T]):
+    """LRU of query → value, matched by token cosine ≥ *threshold*."""
+
+    def __init__(self, maxsize: int = 128, threshold: float = 0.92, ttl: float = 3600) -> None:
+        self._maxsize = maxsize
+        self._threshold = threshold
+        self._ttl = ttl
+        # id -> (scope, token bag, bag norm, expires_at, value)
+        self._entries: OrderedDict[int, tuple[Hashable, Counter[str], float, float, T]] = (
+            OrderedDict()
+        )
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, query: str, scope: Hashable = None) -> T | None:
+        bag = tokenize(query)
+        if not bag:
+            return None
+        norm = _norm(bag)
+        now = time.monotonic()
+
+        best_id, best_score = -1, self._threshold
+        for entry_id, (entry_scope, entry_bag, entry_norm, expires_at, _) in list(
+            self._entries.items()
+        ):
+            if expires_at <= now:
+                del self._entries[entry_id]
+                continue
+            if entry_scope != scope:
+                continue
+            dot = sum(n * entry_bag[tok] for tok, n in bag.items())
+            score = dot / (norm * entry_norm)
+            if score >= best_score:
+                best_id, best_score = entry_id, score
+
+        if best_id < 0:
+            return None
+        self._entries.move_to_end(best_id)
+        return self._entries[best_id][4]
+
+    def set(self, query: str, scope: Hashable, value: T) -> None:
+        bag = tokenize(query)
+        if not bag:
+            return
+        self._entries[self._next_id] = (
+            scope, bag, _norm(bag), time.monotonic() + self._ttl, value
+        )
+        self._next_id += 1
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
@@ -7,6 +7,9 @@ Solodit queries, returning ranked findings.
 
 from __future__ import annotations
 
+import asyncio
+
+from backend.core.cache import TTLCache
 from backend.core.function_analyzer import CodeContext, FunctionAnalyzer
 from backend.core.solodit_client import SearchResult, SoloditClient
 
@@ -21,6 +24,25 @@ _PROTOCOL_SEARCH_MAP: dict[str, str] = {
     "NFT": "nft",
 }
 
+# User-hint substrings → protocol type, checked in priority order
+_PROTOCOL_HINTS: tuple[tuple[str, str], ...] = (
+    ("vault", "Vault"),
+    ("erc4626", "Vault"),
+    ("lending", "Lending"),
+    ("borrow", "Lending"),
+    ("aave", "Lending"),
+    ("dex", "DEX"),
+    ("swap", "DEX"),
+    ("amm", "DEX"),
+    ("uniswap", "DEX"),
+    ("staking", "Staking"),
+    ("stake", "Staking"),
+    ("bridge", "Bridge"),
+    ("cross-chain", "Bridge"),
+    ("oracle", "Oracle"),
+    ("price", "Oracle"),
+)
+
 
 class SmartSearch:
     """Analyse code and produce context-aware Solodit searches."""
@@ -28,6 +50,8 @@ class SmartSearch:
     def __init__(self, client: SoloditClient | None = None) -> None:
         self._analyzer = FunctionAnalyzer()
         self._client = client or SoloditClient()
+        # Identical derived queries are common (retries, re-pasted snippets)
+        self._results: TTLCache[SearchResult] = TTLCache(maxsize=256, ttl=300)
 
     async def search_for_code(
         self,
@@ -47,7 +71,8 @@ class SmartSearch:
         page_size:
             How many findings to fetch per query.
         """
-        ctx = self._analyzer.analyze(code)
+        # Regex analysis is CPU-bound; keep it off the event loop
+        ctx = await asyncio.to_thread(self._analyzer.analyze_cached, code)
 
         # Enrich with user-supplied context
         if user_context:
@@ -69,11 +94,14 @@ class SmartSearch:
 
         keywords = " ".join(terms[:3])
 
-        result = await self._client.search(
-            keywords=keywords,
-            impact=["HIGH", "MEDIUM"],
-            quality_score=2,
-            page_size=page_size,
+        result = await self._results.get_or_set(
+            (keywords, page_size),
+            lambda: self._client.search(
+                keywords=keywords,
+                impact=["HIGH", "MEDIUM"],
+                quality_score=2,
+                page_size=page_size,
+            ),
         )
 
         return ctx, result
@@ -85,25 +113,7 @@ class SmartSearch:
         """Override / enrich context with a user-supplied hint."""
         hint_lower = hint.lower()
 
-        protocol_map = {
-            "vault": "Vault",
-            "erc4626": "Vault",
-            "lending": "Lending",
-            "borrow": "Lending",
-            "aave": "Lending",
-            "dex": "DEX",
-            "swap": "DEX",
-            "amm": "DEX",
-            "uniswap": "DEX",
-            "staking": "Staking",
-            "stake": "Staking",
-            "bridge": "Bridge",
-            "cross-chain": "Bridge",
-            "oracle": "Oracle",
-            "price": "Oracle",
-        }
-
-        for key, proto in protocol_map.items():
+        for key, proto in _PROTOCOL_HINTS:
             if key in hint_lower:
                 ctx.protocol_type = proto
                 break
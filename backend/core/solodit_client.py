@@ -7,13 +7,19 @@ against the Solodit/Cyfrin findings API.
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import random
+import time
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, AsyncIterator
 
 import httpx
+import orjson
 
 from backend.config import config
+from backend.core.cache import DiskCache
+from backend.core.http import SSL_CONTEXT, pool_limits
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +27,10 @@ logger = logging.getLogger(__name__)
 # Data models
 # ---------------------------------------------------------------------------
 
-@dataclass
+# Shared read-only fallback for tag entries without a "tags_tag" object
+_NO_TAG: dict[str, Any] = {}
+
+@dataclass(slots=True)
 class Finding:
     """A single Solodit finding."""
 
@@ -40,14 +49,14 @@ class Finding:
     def from_api(cls, raw: dict[str, Any]) -> Finding:
         """Parse a finding from the Solodit API response."""
         tags: list[str] = []
-        for tag_obj in raw.get("issues_issuetagscore", []):
-            tag_name = tag_obj.get("tags_tag", {}).get("title", "")
+        for tag_obj in raw.get("issues_issuetagscore", ()):
+            tag_name = tag_obj.get("tags_tag", _NO_TAG).get("title")
             if tag_name:
                 tags.append(tag_name)
 
         return cls(
             title=raw.get("title", "Untitled"),
-            impact=raw.get("impact", "UNKNOWN"),
+            impact=(raw.get("impact") or "UNKNOWN").upper(),
             content=raw.get("content", ""),
             firm_name=raw.get("firm_name", "Unknown"),
             protocol_name=raw.get("protocol_name", "Unknown"),
@@ -58,6 +67,11 @@ class Finding:
             slug=raw.get("slug", ""),
         )
 
+    @property
+    def key(self) -> str:
+        """Identity used to de-duplicate results: the slug, else the title."""
+        return self.slug or self.title
+
     def to_dict(self) -> dict[str, Any]:
         """Serialize for JSON responses."""
         return {
@@ -74,7 +88,7 @@ class Finding:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchResult:
     """Paginated search result from Solodit."""
 
@@ -89,13 +103,57 @@ class SearchResult:
 # Client
 # ---------------------------------------------------------------------------
 
+# One pooled HTTP/2 connection set shared by every SoloditClient, so repeated
+# searches reuse a warm TLS connection instead of handshaking per instance.
+_shared_client: httpx.AsyncClient | None = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = httpx.AsyncClient(
+            timeout=30,
+            http2=True,
+            verify=SSL_CONTEXT,
+            limits=pool_limits(),
+        )
+    return _shared_client
+
+
+# 429 handling: retry with exponential backoff (or the server's Retry-After),
+# and hold back every request on this client until the wait has passed.
+_MAX_ATTEMPTS = 3
+_BACKOFF_BASE = 0.5
+_MAX_RETRY_AFTER = 30.0
+
+# search_many: how many queries are in flight at once on the shared connection
+_BATCH_CONCURRENCY = 4
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    retry_after = response.headers.get("Retry-After", "")
+    try:
+        return min(max(float(retry_after), 0.0), _MAX_RETRY_AFTER)
+    except ValueError:
+        return _BACKOFF_BASE * 2**attempt + random.uniform(0, _BACKOFF_BASE)
+
+
 class SoloditClient:
     """Async HTTP client for the Solodit findings API."""
 
-    def __init__(self, api_key: str | None = None) -> None:
+    def __init__(
+        self, api_key: str | None = None, *, client: httpx.AsyncClient | None = None
+    ) -> None:
         self._api_key = api_key or config.cyfrin_api_key
         self._base_url = config.solodit_api_url
-        self._client = httpx.AsyncClient(timeout=30)
+        # An injected client is owned by this instance and closed by close()
+        self._client = client or _get_http_client()
+        self._next_allowed_at = 0.0  # time.monotonic() before which we hold off
+        self._disk_cache: DiskCache | None = None
+        if config.solodit_cache_ttl > 0:
+            self._disk_cache = DiskCache(
+                config.cache_dir / "solodit", config.solodit_cache_ttl
+            )
 
     # -- public API ---------------------------------------------------------
 
@@ -132,22 +190,7 @@ class SoloditClient:
 
         payload = {"page": page, "pageSize": page_size, "filters": filters}
 
-        response = await self._client.post(
-            self._base_url,
-            headers={
-                "Content-Type": "application/json",
-                "X-Cyfrin-API-Key": self._api_key,
-            },
-            json=payload,
-        )
-
-        if response.status_code == 401:
-            raise SoloditAuthError("Invalid or missing CYFRIN_API_KEY")
-        if response.status_code == 429:
-            raise SoloditRateLimitError("Rate limit exceeded — wait and retry")
-        response.raise_for_status()
-
-        data = response.json()
+        data = await self._post_cached(payload)
         metadata = data.get("metadata", {})
         raw_findings = data.get("findings", [])
 
@@ -160,18 +203,134 @@ class SoloditClient:
 
         if "rateLimit" in data:
             result.rate_limit_remaining = data["rateLimit"].get("remaining")
+            if result.rate_limit_remaining == 0:
+                # Budget spent: pace the next call instead of walking into a 429
+                self._hold_off(_BACKOFF_BASE)
 
         return result
 
+    async def search_many(
+        self,
+        queries: list[str],
+        *,
+        concurrency: int = _BATCH_CONCURRENCY,
+        **filters: Any,
+    ) -> dict[str, SearchResult]:
+        """Run ``search`` for each query with the same *filters*.
+
+        Queries are multiplexed over the shared HTTP/2 connection, at most
+        *concurrency* at a time. Failed queries are logged and left out.
+        """
+        return {
+            query: result
+            async for query, result in self.iter_search_many(
+                queries, concurrency=concurrency, **filters
+            )
+        }
+
+    async def iter_search_many(
+        self,
+        queries: list[str],
+        *,
+        concurrency: int = _BATCH_CONCURRENCY,
+        **filters: Any,
+    ) -> AsyncIterator[tuple[str, SearchResult]]:
+        """Yield ``(query, result)`` in query order while fetching ahead.
+
+        Like ``search_many``, but results can be consumed as they arrive.
+        Closing the iterator early (e.g. ``break`` inside ``aclosing``)
+        cancels the searches that are still pending.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _search_one(query: str) -> SearchResult:
+            async with semaphore:
+                return await self.search(query, **filters)
+
+        tasks = [asyncio.create_task(_search_one(q)) for q in queries]
+        try:
+            for query, task in zip(queries, tasks):
+                try:
+                    result = await task
+                except Exception as exc:
+                    logger.warning("Solodit search failed for '%s': %s", query, exc)
+                    continue
+                yield query, result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
     async def get_finding(self, slug: str) -> Finding | None:
         """Fetch a single finding by slug."""
-        # Use a keyword search scoped to the slug as a workaround
-        result = await self.search(keywords=slug, page_size=1)
-        return result.findings[0] if result.findings else None
+        # The API has no by-slug route: send a bare keyword query (no sort or
+        # quality filters) and only build the record whose slug matches exactly.
+        payload = {"page": 1, "pageSize": 5, "filters": {"keywords": slug}}
+        data = await self._post(payload)
+        for raw in data.get("findings", ()):
+            if raw.get("slug") == slug:
+                return Finding.from_api(raw)
+        return None
+
+    # -- internals ----------------------------------------------------------
+
+    async def _post_cached(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """Like ``_post``, but served from the on-disk cache when possible."""
+        if self._disk_cache is None:
+            return orjson.loads(await self._post_raw(payload))
+
+        key = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS).decode()
+        body = await asyncio.to_thread(self._disk_cache.get, key)
+        if body is not None:
+            data = orjson.loads(body)
+            # The stored quota is stale; don't let it pace live requests
+            data.pop("rateLimit", None)
+            return data
+
+        body = await self._post_raw(payload)
+        await asyncio.to_thread(self._disk_cache.set, key, body)
+        return orjson.loads(body)
+
+    async def _post(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return orjson.loads(await self._post_raw(payload))
+
+    async def _post_raw(self, payload: dict[str, Any]) -> bytes:
+        """POST *payload* to the findings API, retrying on HTTP 429."""
+        for attempt in range(_MAX_ATTEMPTS):
+            wait = self._next_allowed_at - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            response = await self._client.post(
+                self._base_url,
+                headers={
+                    "Content-Type": "application/json",
+                    "X-Cyfrin-API-Key": self._api_key,
+                },
+                json=payload,
+            )
+
+            if response.status_code == 401:
+                raise SoloditAuthError("Invalid or missing CYFRIN_API_KEY")
+            if response.status_code == 429:
+                delay = _retry_delay(response, attempt)
+                logger.info("Solodit rate limited; retrying in %.1fs", delay)
+                self._hold_off(delay)
+                continue
+            response.raise_for_status()
+            return response.content
+
+        raise SoloditRateLimitError("Rate limit exceeded — wait and retry")
+
+    def _hold_off(self, seconds: float) -> None:
+        self._next_allowed_at = max(self._next_allowed_at, time.monotonic() + seconds)
 
     async def close(self) -> None:
-        """Shut down the HTTP client."""
+        """Shut down this client's HTTP pool (call once, at app shutdown)."""
+        global _shared_client
         await self._client.aclose()
+        if _shared_client is self._client:
+            _shared_client = None
 
 
 # ---------------------------------------------------------------------------
@@ -12,6 +12,8 @@ from dataclasses import dataclass
 from typing import Any
 
 from backend.core.ai_provider import AIProvider
+from backend.core.cache import TTLCache
+from backend.core.semantic_cache import SemanticCache
 from backend.core.solodit_client import SearchResult, SoloditClient
 
 logger = logging.getLogger(__name__)
@@ -54,6 +56,11 @@ class DictionaryModule:
     ) -> None:
         self._client = client or SoloditClient()
         self._ai = ai or AIProvider()
+        # Repeated lookups (same normalized query/filters) skip the API and the LLM
+        self._results: TTLCache[SearchResult] = TTLCache(maxsize=1024, ttl=3600)
+        self._summaries: TTLCache[str] = TTLCache(maxsize=256, ttl=3600)
+        # Paraphrased queries over the same findings reuse the summary too
+        self._similar_summaries: SemanticCache[str] = SemanticCache(maxsize=256)
 
     async def search(
         self,
@@ -65,12 +72,17 @@ class DictionaryModule:
         with_summary: bool = False,
     ) -> DictionaryResult:
         """Search Solodit and optionally generate an AI summary."""
-        result = await self._client.search(
-            keywords=query,
-            impact=severity or ["HIGH", "MEDIUM"],
-            quality_score=1,
-            page=page,
-            page_size=page_size,
+        impact = severity or ["HIGH", "MEDIUM"]
+        key = (query.strip().lower(), tuple(sorted(impact)), page, page_size)
+        result = await self._results.get_or_set(
+            key,
+            lambda: self._client.search(
+                keywords=query,
+                impact=impact,
+                quality_score=1,
+                page=page,
+                page_size=page_size,
+            ),
         )
 
         ai_summary: str | None = None
@@ -80,11 +92,17 @@ class DictionaryModule:
                 for f in result.findings[:10]
             )
             try:
-                ai_summary = await self._ai.generate(
-                    system_prompt=_SUMMARY_SYSTEM,
-                    user_prompt=f"Query: {query}\n\nTop findings:\n{titles}",
-                    max_tokens=300,
-                )
+                ai_summary = self._similar_summaries.get(query, titles)
+                if ai_summary is None:
+                    ai_summary = await self._summaries.get_or_set(
+                        (key, titles),
+                        lambda: self._ai.generate(
+                            system_prompt=_SUMMARY_SYSTEM,
+                            user_prompt=f"Query: {query}\n\nTop findings:\n{titles}",
+                            max_tokens=300,
+                        ),
+                    )
+                    self._similar_summaries.set(query, titles, ai_summary)
             except Exception as exc:
                 # Never fail search results because summary generation failed.
                 logger.warning("Dictionary AI summary failed for '%s': %s", query, exc)
@@ -10,17 +10,17 @@ from __future__ import annotations
 
 import logging
 import re
-from dataclasses import dataclass, field
-from pathlib import Path
-from typing import Any
+from dataclasses import dataclass, field, replace
+from typing import Any, Awaitable, Callable
 
 from backend.core.ai_provider import AIProvider
+from backend.core.html import fill_empty_code
+from backend.core.prompts import PromptTemplate, load_prompt
+from backend.core.semantic_cache import SemanticCache
 from backend.core.solodit_client import Finding, SoloditClient
 
 logger = logging.getLogger(__name__)
 
-_PROMPTS_DIR = Path(__file__).resolve().parent.parent / "prompts"
-
 # Depth → how many findings to fetch
 _DEPTH_MAP = {
     "quick": 5,
@@ -28,6 +28,24 @@ _DEPTH_MAP = {
     "deep": 50,
 }
 
+# Quality score (0-5, may be fractional) rendered as stars in the prompt
+_STARS = ("", "★", "★★", "★★★", "★★★★", "★★★★★")
+
+# Lesson HTML post-processing
+# Opening tag of a quiz question; a question's body runs to the next opening
+# tag (or the end), so blocks are found by slicing instead of lookahead.
+_QUIZ_START_RE = re.compile(
+    r'<div\s+class="quiz-question"(?:[^>]*data-correct="(\d+)")?[^>]*>'
+)
+# Matched against lowercased text: much faster than re.IGNORECASE on long blocks
+_ANSWER_LETTER_RE = re.compile(r"(?:answer|correct)\s*[:\-]\s*([a-d])")
+_QUIZ_TEXT_RE = re.compile(r"<(?:p|h4)[^>]*>(.*?)</(?:p|h4)>", re.DOTALL)
+_QUIZ_CODE_RE = re.compile(r"<pre><code[^>]*>(.*?)</code></pre>", re.DOTALL)
+_QUIZ_OPTION_RE = re.compile(r'<div\s+class="quiz-option"[^>]*>(.*?)</div>', re.DOTALL)
+_QUIZ_EXPLANATION_RE = re.compile(
+    r'<div\s+class="quiz-explanation"[^>]*>(.*?)</div>', re.DOTALL
+)
+
 
 @dataclass
 class QuizQuestion:
@@ -81,23 +99,33 @@ class LearningModule:
     ) -> None:
         self._client = client or SoloditClient()
         self._ai = ai or AIProvider()
-        self._personality = self._load_prompt("personality.md")
-        self._lesson_template = self._load_prompt("lesson_template.md")
+        self._personality = load_prompt("personality.md")
+        self._lesson_template = PromptTemplate(load_prompt("lesson_template.md"))
+        # Lessons for paraphrased topics ("DEX reentrancy bug") are reused
+        self._lessons: SemanticCache[Lesson] = SemanticCache(maxsize=64)
 
     async def generate_lesson(
         self,
         topic: str,
         depth: str = "standard",
         quiz_count: int = 5,
+        on_chunk: Callable[[str], Awaitable[None]] | None = None,
     ) -> Lesson:
         """Generate a complete lesson on *topic*.
 
         Steps:
         1. Fetch findings from Solodit matching the topic
         2. Build context from titles + content
-        3. Generate structured lesson via AI
+        3. Generate structured lesson via AI (streamed to *on_chunk* if given)
         4. Parse quiz questions from AI output
         """
+        cached = self._lessons.get(topic, (depth, quiz_count))
+        if cached is not None:
+            # Streaming callers still get the body as one chunk before the result
+            if on_chunk is not None:
+                await on_chunk(cached.content_html)
+            return replace(cached, topic=topic)
+
         page_size = _DEPTH_MAP.get(depth, 20)
 
         # 1 — Fetch real findings
@@ -109,11 +137,14 @@ class LearningModule:
         )
 
         if not result.findings:
+            content_html = self._no_findings_html(topic)
+            if on_chunk is not None:
+                await on_chunk(content_html)
             return Lesson(
                 topic=topic,
                 depth=depth,
                 finding_count=0,
-                content_html=self._no_findings_html(topic),
+                content_html=content_html,
             )
 
         # 2 — Build context block from findings
@@ -130,9 +161,9 @@ class LearningModule:
         ]
 
         # 3 — Generate lesson
-        lesson_prompt = self._lesson_template.replace("{topic}", topic)
-        lesson_prompt = lesson_prompt.replace("{finding_count}", str(len(result.findings)))
-        lesson_prompt = lesson_prompt.replace("{quiz_count}", str(quiz_count))
+        lesson_prompt = self._lesson_template.render(
+            topic=topic, finding_count=len(result.findings), quiz_count=quiz_count
+        )
 
         user_prompt = (
             f"{lesson_prompt}\n\n"
@@ -148,13 +179,12 @@ class LearningModule:
             user_prompt=user_prompt,
             temperature=0.7,
             max_tokens=8192,
+            on_chunk=on_chunk,
         )
-        content_html = self._postprocess_lesson_html(content_html)
-
-        # 4 — Parse quiz from HTML
-        quiz = self._parse_quiz(content_html)
+        # 4 — Normalize the HTML and parse the quiz from it in one pass
+        content_html, quiz = self._process_lesson_html(content_html)
 
-        return Lesson(
+        lesson = Lesson(
             topic=topic,
             depth=depth,
             finding_count=len(result.findings),
@@ -162,19 +192,13 @@ class LearningModule:
             quiz=quiz,
             sources=sources,
         )
+        self._lessons.set(topic, (depth, quiz_count), lesson)
+        return lesson
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
 
-    @staticmethod
-    def _load_prompt(name: str) -> str:
-        path = _PROMPTS_DIR / name
-        if path.exists():
-            return path.read_text(encoding="utf-8")
-        logger.warning("Prompt file not found: %s", path)
-        return ""
-
     @staticmethod
     def _build_context(findings: list[Finding]) -> str:
         """Convert findings into a text block for the AI."""
@@ -186,7 +210,7 @@ class LearningModule:
                 f"- **Firm:** {f.firm_name}\n"
                 f"- **Protocol:** {f.protocol_name}\n"
                 f"- **Severity:** {f.impact}\n"
-                f"- **Quality:** {'★' * f.quality_score}\n"
+                f"- **Quality:** {_STARS[min(max(int(f.quality_score), 0), 5)]}\n"
                 f"- **Tags:** {', '.join(f.tags)}\n\n"
                 f"{content_preview}\n"
             )
@@ -199,92 +223,63 @@ class LearningModule:
         Looks for <div class="quiz-question" data-correct="N"> blocks.
         Falls back to empty list if AI didn't follow format exactly.
         """
-        questions: list[QuizQuestion] = []
-
-        # Find quiz question blocks
-        q_pattern = re.compile(
-            r'<div\s+class="quiz-question"[^>]*data-correct="(\d+)"[^>]*>(.*?)</div>\s*(?=<div\s+class="quiz-question"|$)',
-            re.DOTALL,
-        )
-
-        for match in q_pattern.finditer(html):
-            raw_correct = int(match.group(1))
-            block = match.group(2)
-
-            # Extract question text (first <p> or <h4>)
-            q_text_m = re.search(r"<(?:p|h4)[^>]*>(.*?)</(?:p|h4)>", block, re.DOTALL)
-            question = q_text_m.group(1).strip() if q_text_m else "Question"
-
-            # Extract code snippet
-            code_m = re.search(r"<pre><code[^>]*>(.*?)</code></pre>", block, re.DOTALL)
-            code = code_m.group(1).strip() if code_m else ""
-
-            # Extract options
-            opt_pattern = re.compile(
-                r'<div\s+class="quiz-option"[^>]*>(.*?)</div>', re.DOTALL
-            )
-            options = [m.group(1).strip() for m in opt_pattern.finditer(block)]
-
-            if options:
-                # Extract explanation
-                exp_m = re.search(
-                    r'<div\s+class="quiz-explanation"[^>]*>(.*?)</div>', block, re.DOTALL
-                )
-                explanation = exp_m.group(1).strip() if exp_m else ""
-                correct_idx = LearningModule._normalize_correct_index(
-                    raw_correct=raw_correct,
-                    options_count=len(options),
-                    block_html=block,
-                    explanation_html=explanation,
-                )
-
-                questions.append(
-                    QuizQuestion(
-                        question=question,
-                        code_snippet=code,
-                        options=options,
-                        correct_index=correct_idx,
-                        explanation=explanation,
-                    )
-                )
-
-        return questions
+        return LearningModule._process_lesson_html(html)[1]
 
     @staticmethod
     def _postprocess_lesson_html(html: str) -> str:
         """Normalize generated lesson HTML for stable rendering."""
-        out = html
+        return LearningModule._process_lesson_html(html)[0]
 
-        # Replace empty code blocks so the user never sees blank code sections.
-        out = re.sub(
-            r"<pre[^>]*>\s*<code[^>]*>\s*</code>\s*</pre>",
-            "<pre><code>// Source snippet unavailable in finding body.</code></pre>",
-            out,
-            flags=re.IGNORECASE | re.DOTALL,
-        )
+    @staticmethod
+    def _process_lesson_html(html: str) -> tuple[str, list[QuizQuestion]]:
+        """Normalize lesson HTML and extract its quiz questions in one pass.
 
-        # Normalize quiz indices to zero-based for frontend click handling.
-        q_pattern = re.compile(
-            r'(<div\s+class="quiz-question"[^>]*data-correct=")(\d+)(".*?>)(.*?</div>\s*)(?=<div\s+class="quiz-question"|$)',
-            re.DOTALL,
-        )
+        Empty code blocks get a placeholder, and each question's data-correct
+        is rewritten to the zero-based index the frontend expects. The parsed
+        questions carry that same index, so it is only normalized once.
+        """
+        # Replace empty code blocks so the user never sees blank code sections.
+        out = fill_empty_code(html, "// Source snippet unavailable in finding body.")
 
-        def _fix_q(match: re.Match[str]) -> str:
-            head_a, raw_s, head_b, block = match.groups()
-            options_count = len(
-                re.findall(r'<div\s+class="quiz-option"[^>]*>.*?</div>', block, re.DOTALL)
-            )
-            raw_correct = int(raw_s)
-            normalized = LearningModule._normalize_correct_index(
-                raw_correct=raw_correct,
-                options_count=options_count,
+        questions: list[QuizQuestion] = []
+        parts: list[str] = []
+        last = 0
+        starts = list(_QUIZ_START_RE.finditer(out))
+        for i, match in enumerate(starts):
+            if match.group(1) is None:
+                continue  # no answer index: leave untouched, but it still ends a block
+            end = starts[i + 1].start() if i + 1 < len(starts) else len(out)
+            block = out[match.end():end]
+            options = [m.group(1).strip() for m in _QUIZ_OPTION_RE.finditer(block)]
+            correct_idx = LearningModule._normalize_correct_index(
+                raw_correct=int(match.group(1)),
+                options_count=len(options),
                 block_html=block,
-                explanation_html=block,
+                explanation_html="",  # the explanation is part of block
             )
-            return f"{head_a}{normalized}{head_b}{block}"
 
-        out = q_pattern.sub(_fix_q, out)
-        return out
+            # Splice the normalized index in place of the model's value
+            parts.append(out[last:match.start(1)])
+            parts.append(str(correct_idx))
+            last = match.end(1)
+
+            if not options:
+                continue
+            q_text_m = _QUIZ_TEXT_RE.search(block)
+            code_m = _QUIZ_CODE_RE.search(block)
+            exp_m = _QUIZ_EXPLANATION_RE.search(block)
+            questions.append(
+                QuizQuestion(
+                    question=q_text_m.group(1).strip() if q_text_m else "Question",
+                    code_snippet=code_m.group(1).strip() if code_m else "",
+                    options=options,
+                    correct_index=correct_idx,
+                    explanation=exp_m.group(1).strip() if exp_m else "",
+                )
+            )
+
+        parts.append(out[last:])
+        return "".join(parts), questions
 
     @staticmethod
     def _normalize_correct_index(
@@ -299,13 +294,9 @@ class LearningModule:
             return 0
 
         # Prefer explicit letter hints if the model provides them (Answer: B).
-        letter_m = re.search(
-            r"(?:answer|correct)\s*[:\-]\s*([A-D])",
-            f"{block_html} {explanation_html}",
-            re.IGNORECASE,
-        )
+        letter_m = _ANSWER_LETTER_RE.search(f"{block_html} {explanation_html}".lower())
         if letter_m:
-            idx = ord(letter_m.group(1).upper()) - ord("A")
+            idx = ord(letter_m.group(1)) - ord("a")
             if 0 <= idx < options_count:
                 return idx
 
@@ -7,22 +7,24 @@ Solodit findings, and generates AI-synthesised security reports.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import re
+from contextlib import aclosing
 from html import escape
 from dataclasses import dataclass, field
-from pathlib import Path
-from typing import Any
+from typing import Any, Awaitable, Callable
 
 from backend.core.ai_provider import AIProvider
 from backend.core.function_analyzer import FunctionAnalyzer
+from backend.core.html import fill_empty_code, strip_inline_styles
+from backend.core.prompts import PromptTemplate, load_prompt
+from backend.core.query_cluster import coalesce
 from backend.core.solodit_client import Finding, SoloditClient
 from backend.core.smart_search import SmartSearch
 
 logger = logging.getLogger(__name__)
 
-_PROMPTS_DIR = Path(__file__).resolve().parent.parent / "prompts"
-
 # Depth → findings per detected pattern
 _DEPTH_MAP = {
     "quick": 5,
@@ -30,6 +32,18 @@ _DEPTH_MAP = {
     "deep": 50,
 }
 
+# Cap on Solodit queries per report
+_MAX_QUERIES = 8
+
+# How much of the contract and its docs go into the report prompt
+_PROMPT_CODE_CHARS = 6000
+_PROMPT_DOCS_CHARS = 3000
+
+# Dictionary lookups for detected ERCs are prefetched while the report is
+# generated, so a follow-up search is served from the Solodit cache.
+_MAX_PREFETCH = 3
+_PREFETCH_GRACE = 2.0  # seconds to let unfinished prefetches land
+
 # ERC detection patterns
 _ERC_PATTERNS: dict[str, list[str]] = {
     "ERC20": [r"totalSupply", r"balanceOf", r"transfer\s*\(", r"approve\s*\(", r"transferFrom"],
@@ -37,6 +51,32 @@ _ERC_PATTERNS: dict[str, list[str]] = {
     "ERC1155": [r"balanceOfBatch", r"safeBatchTransferFrom", r"ERC1155"],
     "ERC4626": [r"convertToShares", r"convertToAssets", r"maxDeposit", r"previewMint"],
 }
+# Plain identifiers are checked with a substring test; the rest are compiled
+_ERC_MATCHERS: dict[str, list[str | re.Pattern[str]]] = {
+    erc: [p if re.escape(p) == p else re.compile(p) for p in patterns]
+    for erc, patterns in _ERC_PATTERNS.items()
+}
+
+# Contract parsing
+_NAME_RE = re.compile(r"contract\s+(\w+)")
+_IMPORT_RE = re.compile(r'import\s+[{"]([^"};]+)')
+_STATE_RE = re.compile(
+    r"^\s+(?:mapping|uint|int|address|bool|bytes|string|IERC\w+)\S*\s+"
+    r"(?:public|private|internal|immutable|constant)?\s*(\w+)",
+    re.MULTILINE,
+)
+_FUNC_RE = re.compile(
+    r"function\s+(\w+)\s*\(([^)]*)\)\s*((?:external|public|internal|private|view|pure|payable|virtual|override|returns\s*\([^)]*\)|\s)*)",
+    re.MULTILINE,
+)
+# \b keeps the leading \w+ from being retried at every position inside a word
+_CALL_RE = re.compile(r"\b(\w+)\.(call|delegatecall|staticcall|transfer|send)\s*[({]")
+_MOD_RE = re.compile(r"modifier\s+(\w+)")
+
+
+def _norm_title(title: str) -> str:
+    """Dedup key for findings: case- and whitespace-insensitive title."""
+    return " ".join(title.lower().split())
 
 
 @dataclass
@@ -99,14 +139,15 @@ class ScoutModule:
         self._ai = ai or AIProvider()
         self._analyzer = FunctionAnalyzer()
         self._smart_search = SmartSearch(client=self._client)
-        self._personality = self._load_prompt("personality.md")
-        self._report_template = self._load_prompt("scout_template.md")
+        self._personality = load_prompt("personality.md")
+        self._report_template = PromptTemplate(load_prompt("scout_template.md"))
 
     async def generate_report(
         self,
         file_content: str,
         docs_content: str = "",
         depth: str = "standard",
+        on_chunk: Callable[[str], Awaitable[None]] | None = None,
     ) -> ScoutReport:
         """Generate a full security report for a Solidity file.
 
@@ -115,7 +156,7 @@ class ScoutModule:
         2. Analyze code context with FunctionAnalyzer
         3. Search Solodit for each detected risk pattern
         4. Build context from matched findings
-        5. Generate AI report
+        5. Generate AI report (streamed to *on_chunk* if given)
         """
         page_size = _DEPTH_MAP.get(depth, 20)
 
@@ -139,52 +180,38 @@ class ScoutModule:
         for erc in info.ercs_detected:
             search_queries.append(f"{erc} vulnerability")
 
-        # Deduplicate and limit
-        seen_queries: set[str] = set()
-        unique_queries: list[str] = []
-        for q in search_queries:
-            q_lower = q.lower()
-            if q_lower not in seen_queries:
-                seen_queries.add(q_lower)
-                unique_queries.append(q)
+        # Deduplicate (case-insensitively and near-duplicates) and limit
+        unique_queries = coalesce(search_queries)
 
         # Fetch findings for each query
         per_query_size = max(3, page_size // max(len(unique_queries), 1))
         seen_titles: set[str] = set()
 
-        for query in unique_queries[:8]:  # cap at 8 queries to avoid too many API calls
-            try:
-                result = await self._client.search(
-                    keywords=query,
-                    impact=["HIGH", "MEDIUM"],
-                    quality_score=3,
-                    page_size=per_query_size,
-                )
+        queries = unique_queries[:_MAX_QUERIES]  # cap to avoid too many API calls
+        results = self._client.iter_search_many(
+            queries,
+            impact=["HIGH", "MEDIUM"],
+            quality_score=3,
+            page_size=per_query_size,
+        )
+        # Merge in query order so dedup is deterministic; once the report has
+        # enough findings, stop and cancel the searches still pending.
+        async with aclosing(results):
+            async for _, result in results:
                 for f in result.findings:
-                    if f.title not in seen_titles:
-                        seen_titles.add(f.title)
+                    key = _norm_title(f.title)
+                    if key not in seen_titles:
+                        seen_titles.add(key)
                         all_findings.append(f)
-            except Exception as e:
-                logger.warning("Scout search failed for '%s': %s", query, e)
+                if len(all_findings) >= page_size:
+                    break
 
-        # 4 — Build context
-        context_block = self._build_context(all_findings[:page_size])
-        matched = [
-            {
-                "id": f"F{i}",
-                "title": f.title,
-                "firm": f.firm_name,
-                "protocol": f.protocol_name,
-                "impact": f.impact,
-                "link": f.source_link or f.github_link,
-            }
-            for i, f in enumerate(all_findings[:page_size], 1)
-        ]
+        # 4 — Build context, evidence rows and severity counts in one pass
+        selected = all_findings[:page_size]
+        context_block, matched, severity_counts = self._index_findings(selected)
 
         # 5 — Generate AI report
-        report_prompt = self._report_template.replace(
-            "{finding_count}", str(len(all_findings[:page_size]))
-        )
+        report_prompt = self._report_template.render(finding_count=len(selected))
 
         contract_summary = (
             f"Contract: {info.name or 'Unknown'}\n"
@@ -198,12 +225,14 @@ class ScoutModule:
         )
 
         docs_section = ""
-        if docs_content.strip():
-            docs_section = f"\n## Project Documentation\n\n{docs_content[:3000]}\n"
+        if docs_content and not docs_content.isspace():  # no stripped copy of the docs
+            docs_section = (
+                f"\n## Project Documentation\n\n{docs_content[:_PROMPT_DOCS_CHARS]}\n"
+            )
 
         user_prompt = (
             f"{report_prompt}\n\n"
-            f"## Contract Code\n\n```solidity\n{file_content[:6000]}\n```\n\n"
+            f"## Contract Code\n\n```solidity\n{file_content[:_PROMPT_CODE_CHARS]}\n```\n\n"
             f"## Contract Analysis\n\n{contract_summary}\n"
             f"{docs_section}\n"
             f"## Historical Findings Data\n\n{context_block}\n\n"
@@ -211,24 +240,34 @@ class ScoutModule:
             f"rendered in a VS Code webview. Use <h2>, <h3>, <pre><code>, <ul>, <li>, <table> etc."
         )
 
-        content_html = await self._ai.generate(
-            system_prompt=self._personality,
-            user_prompt=user_prompt,
-            temperature=0.5,
-            max_tokens=8192,
-        )
+        # Same parameters as a DictionaryModule lookup, so the payloads match
+        prefetch = [
+            asyncio.create_task(
+                self._client.search(
+                    keywords=erc, impact=["HIGH", "MEDIUM"], quality_score=1, page_size=10
+                )
+            )
+            for erc in info.ercs_detected[:_MAX_PREFETCH]
+        ]
+        try:
+            content_html = await self._ai.generate(
+                system_prompt=self._personality,
+                user_prompt=user_prompt,
+                temperature=0.5,
+                max_tokens=8192,
+                on_chunk=on_chunk,
+            )
+        except BaseException:
+            # Don't hold the error (or a cancelled stream) back for best-effort work
+            for task in prefetch:
+                task.cancel()
+            raise
+        await self._settle_prefetch(prefetch)
         content_html = self._postprocess_report_html(content_html, matched)
 
-        # Severity breakdown
-        severity_counts: dict[str, int] = {"HIGH": 0, "MEDIUM": 0, "LOW": 0}
-        for f in all_findings[:page_size]:
-            sev = f.impact.upper()
-            if sev in severity_counts:
-                severity_counts[sev] += 1
-
         return ScoutReport(
             contract_name=info.name or "Analyzed Contract",
-            findings_count=len(all_findings[:page_size]),
+            findings_count=len(selected),
             severity_breakdown=severity_counts,
             contract_info=info,
             content_html=content_html,
@@ -244,27 +283,18 @@ class ScoutModule:
         info = ContractInfo(loc=len(code.splitlines()))
 
         # Contract name
-        name_match = re.search(r"contract\s+(\w+)", code)
+        name_match = _NAME_RE.search(code)
         if name_match:
             info.name = name_match.group(1)
 
         # Imports
-        info.imports = re.findall(r'import\s+[{"]([^"};]+)', code)
+        info.imports = _IMPORT_RE.findall(code)
 
         # State variables
-        state_re = re.compile(
-            r"^\s+(?:mapping|uint|int|address|bool|bytes|string|IERC\w+)\S*\s+"
-            r"(?:public|private|internal|immutable|constant)?\s*(\w+)",
-            re.MULTILINE,
-        )
-        info.state_variables = [m.group(1) for m in state_re.finditer(code)][:30]
+        info.state_variables = [m.group(1) for m in _STATE_RE.finditer(code)][:30]
 
         # Functions
-        func_re = re.compile(
-            r"function\s+(\w+)\s*\(([^)]*)\)\s*((?:external|public|internal|private|view|pure|payable|virtual|override|returns\s*\([^)]*\)|\s)*)",
-            re.MULTILINE,
-        )
-        for m in func_re.finditer(code):
+        for m in _FUNC_RE.finditer(code):
             info.functions.append({
                 "name": m.group(1),
                 "params": m.group(2).strip(),
@@ -272,20 +302,22 @@ class ScoutModule:
             })
 
         # External calls
-        call_re = re.compile(r"(\w+)\.(call|delegatecall|staticcall|transfer|send)\s*[({]")
         info.external_calls = list(set(
-            f"{m.group(1)}.{m.group(2)}" for m in call_re.finditer(code)
+            f"{m.group(1)}.{m.group(2)}" for m in _CALL_RE.finditer(code)
         ))
 
         # Modifiers
-        mod_re = re.compile(r"modifier\s+(\w+)")
-        info.modifiers_used = [m.group(1) for m in mod_re.finditer(code)]
-
-        # ERC detection
-        for erc_name, patterns in _ERC_PATTERNS.items():
-            matches = sum(1 for p in patterns if re.search(p, code))
-            if matches >= 2:  # need at least 2 pattern matches
-                info.ercs_detected.append(erc_name)
+        info.modifiers_used = _MOD_RE.findall(code)
+
+        # ERC detection: need at least 2 pattern matches; stop once we have them
+        for erc_name, matchers in _ERC_MATCHERS.items():
+            matches = 0
+            for m in matchers:
+                if (m in code) if isinstance(m, str) else m.search(code):
+                    matches += 1
+                    if matches >= 2:
+                        info.ercs_detected.append(erc_name)
+                        break
 
         return info
 
@@ -294,16 +326,25 @@ class ScoutModule:
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _load_prompt(name: str) -> str:
-        path = _PROMPTS_DIR / name
-        if path.exists():
-            return path.read_text(encoding="utf-8")
-        logger.warning("Prompt file not found: %s", path)
-        return ""
+    async def _settle_prefetch(tasks: list[asyncio.Task[Any]]) -> None:
+        """Give prefetches a short grace period, then cancel the stragglers."""
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=_PREFETCH_GRACE)
+        for task in pending:
+            task.cancel()
+        for task in tasks:
+            if task.done() and not task.cancelled() and task.exception() is not None:
+                logger.debug("Scout prefetch failed: %s", task.exception())
 
     @staticmethod
-    def _build_context(findings: list[Finding]) -> str:
+    def _index_findings(
+        findings: list[Finding],
+    ) -> tuple[str, list[dict[str, str]], dict[str, int]]:
+        """Build the prompt context, evidence-map rows and severity counts."""
         parts: list[str] = []
+        matched: list[dict[str, str]] = []
+        severity_counts: dict[str, int] = {"HIGH": 0, "MEDIUM": 0, "LOW": 0}
         for i, f in enumerate(findings, 1):
             content_preview = (f.content[:600] + "...") if len(f.content) > 600 else f.content
             parts.append(
@@ -314,24 +355,26 @@ class ScoutModule:
                 f"- **Tags:** {', '.join(f.tags)}\n\n"
                 f"{content_preview}\n"
             )
-        return "\n---\n".join(parts)
+            matched.append({
+                "id": f"F{i}",
+                "title": f.title,
+                "firm": f.firm_name,
+                "protocol": f.protocol_name,
+                "impact": f.impact,
+                "link": f.source_link or f.github_link,
+            })
+            if f.impact in severity_counts:  # impact is uppercased at parse time
+                severity_counts[f.impact] += 1
+        return "\n---\n".join(parts), matched, severity_counts
 
     @staticmethod
     def _postprocess_report_html(html: str, matched: list[dict[str, str]]) -> str:
         """Normalize generated report HTML for readability and evidence traceability."""
-        out = html
-
         # Remove model-injected inline styling that can make text unreadable in dark themes.
-        out = re.sub(r'\sstyle="[^"]*"', "", out, flags=re.IGNORECASE)
-        out = re.sub(r"\sstyle='[^']*'", "", out, flags=re.IGNORECASE)
+        out = strip_inline_styles(html)
 
         # Ensure code blocks are never blank.
-        out = re.sub(
-            r"<pre[^>]*>\s*<code[^>]*>\s*</code>\s*</pre>",
-            "<pre><code>// Patch/example unavailable in generated output.</code></pre>",
-            out,
-            flags=re.IGNORECASE | re.DOTALL,
-        )
+        out = fill_empty_code(out, "// Patch/example unavailable in generated output.")
 
         # Append an explicit evidence map for auditable references.
         if matched:
@@ -7,28 +7,38 @@ The VS Code extension communicates with this over localhost.
 
 from __future__ import annotations
 
+import asyncio
 import logging
-import re
 from contextlib import asynccontextmanager
 from html import escape as html_escape
-from typing import Any
+from typing import Any, AsyncIterator, Awaitable, Callable
 
+import orjson
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 from backend.config import config
 from backend.core.solodit_client import SoloditClient, SoloditError
 from backend.core.smart_search import SmartSearch
-from backend.core.function_analyzer import FunctionAnalyzer
-from backend.core.ai_provider import AIProvider
+from backend.core.pitfall_search import PitfallSearch
+from backend.core.ai_provider import AUTH_ERRORS, RATE_LIMIT_ERRORS, TIMEOUT_ERRORS, AIProvider
+from backend.core.html import strip_inline_styles
+from backend.core.prompts import load_prompt
 from backend.modules.dictionary import DictionaryModule
 from backend.modules.learning import LearningModule
 from backend.modules.scout import ScoutModule
 
 logger = logging.getLogger(__name__)
 
+# Above this size, scrubbing (~7 µs/KB) outweighs a thread hop (~45 µs), so it
+# runs off the event loop
+_SCRUB_OFFLOAD_CHARS = 16_384
+
+# Read at import so no request path touches the disk
+_PITFALL_PROMPT = load_prompt("pitfall_template.md")
+
 # ---------------------------------------------------------------------------
 # Shared state (initialised on startup, torn down on shutdown)
 # ---------------------------------------------------------------------------
@@ -36,6 +46,7 @@ logger = logging.getLogger(__name__)
 _solodit: SoloditClient | None = None
 _dictionary: DictionaryModule | None = None
 _smart_search: SmartSearch | None = None
+_pitfall_search: PitfallSearch | None = None
 _ai: AIProvider | None = None
 _learning: LearningModule | None = None
 _scout: ScoutModule | None = None
@@ -44,7 +55,7 @@ _scout: ScoutModule | None = None
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup / shutdown lifecycle."""
-    global _solodit, _dictionary, _smart_search, _ai, _learning, _scout
+    global _solodit, _dictionary, _smart_search, _pitfall_search, _ai, _learning, _scout
 
     # Validate config
     issues = config.validate()
@@ -55,6 +66,7 @@ async def lifespan(app: FastAPI):
     _solodit = SoloditClient()
     _ai = AIProvider()
     _smart_search = SmartSearch(client=_solodit)
+    _pitfall_search = PitfallSearch(client=_solodit)
     _dictionary = DictionaryModule(client=_solodit, ai=_ai)
     _learning = LearningModule(client=_solodit, ai=_ai)
     _scout = ScoutModule(client=_solodit, ai=_ai)
@@ -72,11 +84,19 @@ async def lifespan(app: FastAPI):
 # App
 # ---------------------------------------------------------------------------
 
+class _ORJSONResponse(JSONResponse):
+    """JSON response encoded with orjson; /scout and /pitfall return large HTML."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
 app = FastAPI(
     title="Diablo",
     description="AI-Powered Smart Contract Security Intelligence",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=_ORJSONResponse,
 )
 
 app.add_middleware(
@@ -87,33 +107,59 @@ app.add_middleware(
 )
 
 
-@app.exception_handler(Exception)
-async def global_exception_handler(request, exc):
-    """Return user-friendly JSON for common error classes."""
+_RATE_LIMIT_DETAIL = (
+    "AI provider rate limit reached. Wait a moment and try again, or switch providers."
+)
+_DATA_POLICY_DETAIL = (
+    "OpenRouter blocked this free model due to your privacy policy. "
+    "In OpenRouter settings, allow free-model data policy publication "
+    "or switch DIABLO_AI_MODEL to a non-free model."
+)
+_AUTH_DETAIL = "AI API key is invalid or missing. Check your .env file."
+_TIMEOUT_DETAIL = "Request timed out. Try a smaller depth or simpler query."
+
+# Typed SDK/transport errors are mapped first; message matching is the fallback
+_TYPED_ERRORS: tuple[tuple[tuple[type[BaseException], ...], int, str], ...] = (
+    (RATE_LIMIT_ERRORS, 429, _RATE_LIMIT_DETAIL),
+    (AUTH_ERRORS, 401, _AUTH_DETAIL),
+    (TIMEOUT_ERRORS, 504, _TIMEOUT_DETAIL),
+)
+
+
+def _error_status_detail(
+    exc: BaseException, failure: str = "Internal error"
+) -> tuple[int, str]:
+    """Map a failure to the HTTP status and user-friendly detail shown for it.
+
+    Shared by the exception handler, the endpoints that catch their own
+    errors and the NDJSON streams, so each failure reads the same everywhere.
+    """
+    if isinstance(exc, SoloditError):
+        return 502, str(exc)
+    for types, status, detail in _TYPED_ERRORS:
+        if isinstance(exc, types):
+            return status, detail
+
     msg = str(exc)
-    status = 500
+    lowered = msg.lower()
 
     # Rate-limit errors (Gemini, OpenAI, Anthropic)
-    if "429" in msg or "RESOURCE_EXHAUSTED" in msg or "rate" in msg.lower():
-        status = 429
-        detail = "AI provider rate limit reached. Wait a moment and try again, or switch providers."
-    elif "No endpoints found matching your data policy" in msg:
-        status = 400
-        detail = (
-            "OpenRouter blocked this free model due to your privacy policy. "
-            "In OpenRouter settings, allow free-model data policy publication "
-            "or switch DIABLO_AI_MODEL to a non-free model."
-        )
-    elif "401" in msg or "403" in msg or "AuthenticationError" in msg:
-        status = 401
-        detail = "AI API key is invalid or missing. Check your .env file."
-    elif "timeout" in msg.lower() or "timed out" in msg.lower():
-        status = 504
-        detail = "Request timed out. Try a smaller depth or simpler query."
-    else:
-        detail = f"Internal error: {msg[:200]}"
+    if "429" in msg or "RESOURCE_EXHAUSTED" in msg or "rate" in lowered:
+        return 429, _RATE_LIMIT_DETAIL
+    if "No endpoints found matching your data policy" in msg:
+        return 400, _DATA_POLICY_DETAIL
+    if "401" in msg or "403" in msg or "AuthenticationError" in msg:
+        return 401, _AUTH_DETAIL
+    if "timeout" in lowered or "timed out" in lowered:
+        return 504, _TIMEOUT_DETAIL
+    return 500, f"{failure}: {msg[:200]}"
 
-    return JSONResponse(status_code=status, content={"detail": detail})
+
+@app.exception_handler(Exception)
+async def global_exception_handler(request, exc):
+    """Return user-friendly JSON for common error classes."""
+    status, detail = _error_status_detail(exc)
+    return _ORJSONResponse(status_code=status, content={"detail": detail})
 
 
 # ---------------------------------------------------------------------------
@@ -226,7 +272,7 @@ async def learn(req: LearnRequest) -> dict[str, Any]:
         raise HTTPException(502, str(exc)) from exc
     except Exception as exc:
         logger.exception("Lesson generation failed")
-        raise HTTPException(500, f"Lesson generation failed: {exc}") from exc
+        raise HTTPException(*_error_status_detail(exc, "Lesson generation failed")) from exc
 
 
 @app.post("/scout")
@@ -245,106 +291,97 @@ async def scout(req: ScoutRequest) -> dict[str, Any]:
     except SoloditError as exc:
         raise HTTPException(502, str(exc)) from exc
     except Exception as exc:
-        err_str = str(exc)
         logger.exception("Report generation failed")
-        # Surface rate-limit errors clearly
-        if "429" in err_str or "RESOURCE_EXHAUSTED" in err_str:
-            raise HTTPException(
-                429,
-                "AI rate limit exceeded. Your Gemini free-tier quota is exhausted. "
-                "Wait a minute and try again, or set OPENAI_API_KEY / ANTHROPIC_API_KEY in .env"
-            ) from exc
-        raise HTTPException(500, f"Report generation failed: {exc}") from exc
+        raise HTTPException(*_error_status_detail(exc, "Report generation failed")) from exc
 
 
-@app.post("/pitfall")
-async def pitfall(req: PitfallRequest) -> dict[str, Any]:
-    """Context-aware pitfall card — highlight code, get real audit intel."""
-    if not _smart_search or not _ai:
-        raise HTTPException(503, "Backend not initialised")
+async def _ndjson_events(
+    run: Callable[[Callable[[str], Awaitable[None]]], Awaitable[Any]],
+    failure: str = "Generation failed",
+) -> AsyncIterator[bytes]:
+    """Drive *run* and emit its streamed chunks, then its result, as NDJSON.
+
+    Events: ``{"type": "chunk", "text": ...}`` while the model writes,
+    then one ``{"type": "done", "result": ...}`` or
+    ``{"type": "error", "status": ..., "detail": ...}``, with the same status
+    and detail the non-streaming endpoint would return.
+    """
+    queue: asyncio.Queue[str | None] = asyncio.Queue()
 
-    # 1. Analyze BOTH selection and surrounding code separately
-    analyzer = FunctionAnalyzer()
-
-    # Selection analysis drives the primary query
-    sel_ctx = analyzer.analyze(req.selection)
-
-    # Surrounding code provides secondary context
-    full_ctx = analyzer.analyze(req.surrounding_code) if req.surrounding_code else sel_ctx
-
-    # Merge: selection wins for function_name, surrounding adds risk/protocol info
-    ctx = sel_ctx
-    if not ctx.function_name and full_ctx.function_name:
-        ctx.function_name = full_ctx.function_name
-    if not ctx.protocol_type and full_ctx.protocol_type:
-        ctx.protocol_type = full_ctx.protocol_type
-    # Add risk patterns from surrounding code, but don't let them dominate
-    for rp in full_ctx.risk_patterns:
-        if rp not in ctx.risk_patterns:
-            ctx.risk_patterns.append(rp)
-
-    # 2. Build query set — keep selection-specific intent first
-    raw_selection = req.selection.strip()
-    sel_name = re.sub(r"\(.*", "", raw_selection).strip()
-    sel_name = sel_name.split()[-1] if sel_name.split() else sel_name
-    sel_name = sel_name.lstrip("_")
-
-    query_candidates: list[str] = []
-    if sel_name:
-        query_candidates.append(sel_name)
-        query_candidates.append(f"{sel_name} vulnerability")
-    if ctx.function_name and ctx.function_name.lower() != sel_name.lower():
-        query_candidates.append(ctx.function_name)
-    if ctx.function_type:
-        query_candidates.append(ctx.function_type)
-    if ctx.risk_patterns:
-        query_candidates.extend(ctx.risk_patterns[:2])
-    if ctx.suggested_keywords:
-        query_candidates.extend(ctx.suggested_keywords[:3])
-    if raw_selection and raw_selection != sel_name:
-        query_candidates.append(raw_selection[:120])
-
-    # Deduplicate and normalize order
-    seen_queries: set[str] = set()
-    unique_queries: list[str] = []
-    for q in query_candidates:
-        q = q.strip()
-        if not q:
-            continue
-        k = q.lower()
-        if k not in seen_queries:
-            seen_queries.add(k)
-            unique_queries.append(q)
-
-    findings: list[dict[str, Any]] = []
-    query_used = unique_queries[0] if unique_queries else raw_selection
-
-    # 3. Search Solodit directly with curated queries and rank by relevance
-    scored: list[tuple[int, dict[str, Any]]] = []
-    seen_keys: set[str] = set()
-    for query in unique_queries[:6]:
+    async def on_chunk(text: str) -> None:
+        await queue.put(text)
+
+    task = asyncio.create_task(run(on_chunk))
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+    try:
+        while (text := await queue.get()) is not None:
+            yield orjson.dumps({"type": "chunk", "text": text}) + b"\n"
         try:
-            result = await _solodit.search(
-                keywords=query,
-                impact=["HIGH", "MEDIUM"],
-                quality_score=2,
-                page_size=4,
-            )
+            event = {"type": "done", "result": task.result().to_dict()}
         except Exception as exc:
-            logger.warning("Pitfall search failed for '%s': %s", query, exc)
-            continue
+            logger.exception("Streamed generation failed")
+            status, detail = _error_status_detail(exc, failure)
+            event = {"type": "error", "status": status, "detail": detail}
+        yield orjson.dumps(event) + b"\n"
+    finally:
+        task.cancel()  # client went away mid-stream
+
 
-        for f in result.findings:
-            f_dict = f.to_dict()
-            key = f_dict.get("slug") or f_dict.get("title", "")
-            if key in seen_keys:
-                continue
-            seen_keys.add(key)
-            score = _pitfall_relevance_score(f_dict, sel_name=sel_name, ctx=ctx)
-            scored.append((score, f_dict))
+@app.post("/learn/stream")
+async def learn_stream(req: LearnRequest) -> StreamingResponse:
+    """Like /learn, but streams the lesson HTML as it is generated (NDJSON)."""
+    if not _learning:
+        raise HTTPException(503, "Backend not initialised")
+    learning = _learning
+
+    return StreamingResponse(
+        _ndjson_events(
+            lambda on_chunk: learning.generate_lesson(
+                topic=req.topic,
+                depth=req.depth,
+                quiz_count=req.quiz_count,
+                on_chunk=on_chunk,
+            ),
+            "Lesson generation failed",
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.post("/scout/stream")
+async def scout_stream(req: ScoutRequest) -> StreamingResponse:
+    """Like /scout, but streams the report HTML as it is generated (NDJSON)."""
+    if not _scout:
+        raise HTTPException(503, "Backend not initialised")
+    scout_module = _scout
+
+    return StreamingResponse(
+        _ndjson_events(
+            lambda on_chunk: scout_module.generate_report(
+                file_content=req.file_content,
+                docs_content=req.docs_content,
+                depth=req.depth,
+                on_chunk=on_chunk,
+            ),
+            "Report generation failed",
+        ),
+        media_type="application/x-ndjson",
+    )
 
-    scored.sort(key=lambda it: it[0], reverse=True)
-    findings = [f for _, f in scored[:5]]
+
+@app.post("/pitfall")
+async def pitfall(req: PitfallRequest) -> dict[str, Any]:
+    """Context-aware pitfall card — highlight code, get real audit intel."""
+    if not _pitfall_search or not _ai:
+        raise HTTPException(503, "Backend not initialised")
+
+    # 1-3. Analyze the selection, search Solodit and rank by relevance
+    matches = await _pitfall_search.search_and_score(
+        req.selection, req.surrounding_code, top_k=5
+    )
+    ctx = matches.ctx
+    findings = matches.findings
+    query_used = matches.query_used
 
     if not findings:
         return {
@@ -355,19 +392,18 @@ async def pitfall(req: PitfallRequest) -> dict[str, Any]:
         }
 
     # 4. Generate conversational pitfall card via AI
-    from pathlib import Path
-    prompt_path = Path(__file__).parent / "prompts" / "pitfall_template.md"
-    system_prompt = prompt_path.read_text()
-
-    findings_text = ""
+    parts: list[str] = []
     for i, f in enumerate(findings[:3], 1):
-        findings_text += f"\n--- Finding {i} ---\n"
-        findings_text += f"Title: {f.get('title', '')}\n"
-        findings_text += f"Firm: {f.get('firm_name', '')}\n"
-        findings_text += f"Protocol: {f.get('protocol_name', '')}\n"
-        findings_text += f"Severity: {f.get('impact', '')}\n"
         content = f.get("content", "")[:1500]
-        findings_text += f"Content: {content}\n"
+        parts.append(
+            f"\n--- Finding {i} ---\n"
+            f"Title: {f.get('title', '')}\n"
+            f"Firm: {f.get('firm_name', '')}\n"
+            f"Protocol: {f.get('protocol_name', '')}\n"
+            f"Severity: {f.get('impact', '')}\n"
+            f"Content: {content}\n"
+        )
+    findings_text = "".join(parts)
 
     user_prompt = f"""## User's Code Selection
 ```solidity
@@ -387,8 +423,8 @@ async def pitfall(req: PitfallRequest) -> dict[str, Any]:
 Generate the Pitfall Card HTML now."""
 
     try:
-        card_html = await _ai.generate(
-            system_prompt=system_prompt,
+        card_html = await _ai.generate_hedged(
+            system_prompt=_PITFALL_PROMPT,
             user_prompt=user_prompt,
             temperature=0.7,
             max_tokens=2048,
@@ -413,57 +449,19 @@ Generate the Pitfall Card HTML now."""
 @app.post("/fix-draft")
 async def fix_draft(req: FixDraftRequest) -> dict[str, Any]:
     """Generate a concise patch draft for selected Solidity code."""
-    if not _solodit or not _ai:
+    if not _pitfall_search or not _ai:
         raise HTTPException(503, "Backend not initialised")
 
-    analyzer = FunctionAnalyzer()
-    sel_ctx = analyzer.analyze(req.selection)
-    full_ctx = analyzer.analyze(req.surrounding_code) if req.surrounding_code else sel_ctx
-    ctx = sel_ctx
-    if not ctx.function_name and full_ctx.function_name:
-        ctx.function_name = full_ctx.function_name
-    for rp in full_ctx.risk_patterns:
-        if rp not in ctx.risk_patterns:
-            ctx.risk_patterns.append(rp)
-
-    raw_selection = req.selection.strip()
-    sel_name = re.sub(r"\(.*", "", raw_selection).strip()
-    sel_name = sel_name.split()[-1] if sel_name.split() else sel_name
-    sel_name = sel_name.lstrip("_")
-
-    query_candidates: list[str] = []
-    if sel_name:
-        query_candidates.extend([sel_name, f"{sel_name} vulnerability"])
-    if ctx.function_type:
-        query_candidates.append(ctx.function_type)
-    query_candidates.extend(ctx.risk_patterns[:2])
-    query_candidates.extend(ctx.suggested_keywords[:2])
-    query_candidates = [q for i, q in enumerate(query_candidates) if q and q not in query_candidates[:i]]
-
-    scored: list[tuple[int, dict[str, Any]]] = []
-    seen_keys: set[str] = set()
-    for query in query_candidates[:5]:
-        try:
-            result = await _solodit.search(
-                keywords=query,
-                impact=["HIGH", "MEDIUM"],
-                quality_score=2,
-                page_size=3,
-            )
-        except Exception as exc:
-            logger.warning("Fix draft search failed for '%s': %s", query, exc)
-            continue
-        for f in result.findings:
-            f_dict = f.to_dict()
-            key = f_dict.get("slug") or f_dict.get("title", "")
-            if key in seen_keys:
-                continue
-            seen_keys.add(key)
-            scored.append((_pitfall_relevance_score(f_dict, sel_name=sel_name, ctx=ctx), f_dict))
-    scored.sort(key=lambda x: x[0], reverse=True)
-    findings = [f for _, f in scored[:3]]
-
-    findings_text = ""
+    # Patch drafts need fewer references than pitfall cards: 5 queries x 3,
+    # cut from /pitfall's cached searches on the same selection
+    matches = await _pitfall_search.search_and_score(
+        req.selection, req.surrounding_code, top_k=3, max_queries=5, page_size=3
+    )
+    ctx = matches.ctx
+    sel_name = matches.sel_name
+    findings = matches.findings
+
+    parts: list[str] = []
     refs = []
     for i, f in enumerate(findings, 1):
         ref = f"F{i}"
@@ -477,11 +475,12 @@ async def fix_draft(req: FixDraftRequest) -> dict[str, Any]:
                 "link": f.get("source_link", "") or f.get("github_link", ""),
             }
         )
-        findings_text += (
+        parts.append(
             f"\n[{ref}] {f.get('title', '')}\n"
             f"Firm: {f.get('firm_name', '')}, Protocol: {f.get('protocol_name', '')}, Severity: {f.get('impact', '')}\n"
             f"Content: {(f.get('content', '') or '')[:1200]}\n"
         )
+    findings_text = "".join(parts)
 
     system_prompt = (
         "You are a senior Solidity security engineer. Draft a minimal, auditable fix.\n"
@@ -500,7 +499,7 @@ async def fix_draft(req: FixDraftRequest) -> dict[str, Any]:
     )
 
     try:
-        draft_html = await _ai.generate(
+        draft_html = await _ai.generate_hedged(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
             temperature=0.2,
@@ -526,32 +525,37 @@ async def fix_draft(req: FixDraftRequest) -> dict[str, Any]:
         )
 
     # final cleanup for readability/safety in webview
-    draft_html = re.sub(r'\sstyle="[^"]*"', "", draft_html, flags=re.IGNORECASE)
-    draft_html = re.sub(r"\sstyle='[^']*'", "", draft_html, flags=re.IGNORECASE)
+    if len(draft_html) > _SCRUB_OFFLOAD_CHARS:
+        draft_html = await asyncio.to_thread(strip_inline_styles, draft_html)
+    else:
+        draft_html = strip_inline_styles(draft_html)
 
     return {
         "analysis": ctx.to_dict(),
         "draft_html": draft_html,
         "references": refs,
-        "query_used": query_candidates[0] if query_candidates else raw_selection,
+        "query_used": matches.query_used,
     }
 
 
+# Fallback card severity badge colours (anything else renders as low/info)
+_SEV_COLORS = {"HIGH": "#f87171", "MEDIUM": "#fbbf24"}
+_SEV_COLOR_DEFAULT = "#60a5fa"
+
+
 def _build_fallback_card(ctx, findings: list[dict]) -> str:
     """Build a simple HTML pitfall card when AI generation fails."""
-    import html as html_mod
-
     func_label = ctx.function_name or "this code"
     risks = ", ".join(ctx.risk_patterns) if ctx.risk_patterns else "potential issues"
 
-    items = ""
+    items: list[str] = []
     for f in findings:
-        title = html_mod.escape(f.get("title", "Unknown"))
-        firm = html_mod.escape(f.get("firm_name", ""))
-        protocol = html_mod.escape(f.get("protocol_name", ""))
-        sev = html_mod.escape(f.get("impact", "MEDIUM"))
-        sev_color = "#f87171" if sev == "HIGH" else "#fbbf24" if sev == "MEDIUM" else "#60a5fa"
-        items += (
+        title = html_escape(f.get("title", "Unknown"))
+        firm = html_escape(f.get("firm_name", ""))
+        protocol = html_escape(f.get("protocol_name", ""))
+        sev = html_escape(f.get("impact", "MEDIUM"))
+        sev_color = _SEV_COLORS.get(sev, _SEV_COLOR_DEFAULT)
+        items.append(
             f'<div style="background:rgba(255,255,255,0.04);border-radius:6px;'
             f'padding:10px 12px;margin-top:6px;">'
             f'<div style="font-weight:600;font-size:13px;">{title}</div>'
@@ -567,69 +571,30 @@ def _build_fallback_card(ctx, findings: list[dict]) -> str:
         f'<div style="font-size:14px;font-weight:600;margin-bottom:6px;">'
         f'Potential issue found in {len(findings)} related audit finding(s)</div>'
         f'<div style="font-size:13px;color:#bbb;margin-bottom:10px;">'
-        f'<code>{html_mod.escape(func_label)}</code> matches patterns related to '
-        f'<strong>{html_mod.escape(risks)}</strong>. '
+        f'<code>{html_escape(func_label)}</code> matches patterns related to '
+        f'<strong>{html_escape(risks)}</strong>. '
         f'Here are real audit findings from past security reviews:</div>'
-        f'{items}</div>'
+        f'{"".join(items)}</div>'
     )
 
 
-def _pitfall_relevance_score(finding: dict[str, Any], *, sel_name: str, ctx) -> int:
-    """Score findings so the top cards align with the highlighted selection."""
-    title = (finding.get("title") or "").lower()
-    content = (finding.get("content") or "").lower()
-    tags = " ".join((finding.get("tags") or [])).lower()
-    haystack = " ".join([title, tags, content[:1200]])
-
-    score = 0
-    if sel_name:
-        sel = sel_name.lower()
-        if sel in title:
-            score += 80
-        if sel in tags:
-            score += 50
-        if sel in haystack:
-            score += 30
-        # Common mapping for "balances" style selections
-        if sel in {"balance", "balances", "_balances"} and any(
-            token in haystack
-            for token in (
-                "accounting",
-                "claim",
-                "double",
-                "share",
-                "totalassets",
-                "totalsupply",
-                "rounding",
-            )
-        ):
-            score += 35
-
-    for risk in getattr(ctx, "risk_patterns", [])[:3]:
-        if risk.lower() in haystack:
-            score += 20
-
-    sev = (finding.get("impact") or "").upper()
-    if sev == "HIGH":
-        score += 8
-    elif sev == "MEDIUM":
-        score += 4
-    return score
-
-
 # ---------------------------------------------------------------------------
 # Entrypoint
 # ---------------------------------------------------------------------------
 
 def start() -> None:
-    """Run the server directly with ``python -m backend.server``."""
+    """Run the server directly with ``python -m backend.server``.
+
+    uvicorn picks uvloop and httptools automatically when installed
+    (``uvicorn[standard]``). Set ``DIABLO_RELOAD=on`` to reload on edits.
+    """
     import uvicorn
 
     uvicorn.run(
         "backend.server:app",
         host=config.host,
         port=config.port,
-        reload=True,
+        reload=config.auto_reload,
         log_level="info",
     )
 
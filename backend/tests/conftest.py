@@ -0,0 +1,57 @@
+"""Shared test fakes: Solodit findings and an in-memory Solodit client."""
+
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable
+
+import pytest
+
+from backend.core.solodit_client import Finding, SearchResult, SoloditClient
+
+
+def _make_finding(title: str, impact: str = "HIGH", content: str = "") -> Finding:
+    return Finding(
+        title=title, impact=impact, content=content, firm_name="Cyfrin", protocol_name="P",
+        quality_score=4, source_link="", github_link="", tags=[], slug=title,
+    )
+
+
+class FakeSolodit:
+    """Stands in for SoloditClient; records every search it is asked for.
+
+    *respond* is awaited with ``(keywords, **kwargs)`` and returns the
+    findings for that search (or raises). By default each search returns one
+    finding titled after its keywords.
+    """
+
+    iter_search_many = SoloditClient.iter_search_many
+
+    def __init__(
+        self, respond: Callable[..., Awaitable[list[Finding]]] | None = None
+    ) -> None:
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+        self._respond = respond
+
+    @property
+    def queries(self) -> list[str]:
+        return [keywords for keywords, _ in self.calls]
+
+    async def search(self, keywords: str = "", **kwargs) -> SearchResult:
+        self.calls.append((keywords, kwargs))
+        if self._respond is None:
+            findings = [_make_finding(keywords)]
+        else:
+            findings = await self._respond(keywords, **kwargs)
+        return SearchResult(findings=findings, total=len(findings), page=1, total_pages=1)
+
+
+@pytest.fixture
+def make_finding() -> Callable[..., Finding]:
+    """Factory for minimal findings: ``make_finding(title, impact="HIGH", content="")``."""
+    return _make_finding
+
+
+@pytest.fixture
+def fake_solodit() -> type[FakeSolodit]:
+    """The FakeSolodit class; call it (optionally with *respond*) per client."""
+    return FakeSolodit
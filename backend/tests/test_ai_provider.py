@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from backend.core.ai_provider import AIProvider
+
+
+def _provider(fast_model: str) -> AIProvider:
+    ai = AIProvider()
+    ai._model = "flagship"
+    ai._fast_model = fast_model
+    return ai
+
+
+def test_route_sends_short_bounded_prompts_to_fast_model():
+    ai = _provider("fast")
+    assert ai._route("system", "summarise these titles", 300) == "fast"
+    assert ai._route("system", "write a lesson", 8192) == "flagship"
+    assert ai._route("system", "x" * 10_000, 300) == "flagship"
+
+
+def test_route_disabled_without_fast_model():
+    assert _provider("")._route("system", "short", 100) == "flagship"
+
+
+def test_strip_fences():
+    assert AIProvider._strip_fences("```html\n<p>hi</p>\n```") == "<p>hi</p>"
+    assert AIProvider._strip_fences("  <p>plain</p>\n") == "<p>plain</p>"
+
+
+def test_generate_with_on_chunk_streams_and_returns_full_text():
+    ai = _provider("")
+    ai._provider = "openai"
+
+    async def fake_stream(*args):
+        for chunk in ("```html\n<p>", "hi</p>", "\n```"):
+            yield chunk
+
+    ai._openai_stream = fake_stream
+    seen: list[str] = []
+
+    async def on_chunk(text: str) -> None:
+        seen.append(text)
+
+    result = asyncio.run(ai.generate("system", "user", on_chunk=on_chunk))
+    assert seen == ["```html\n<p>", "hi</p>", "\n```"]
+    assert result == "<p>hi</p>"
+
+
+def test_generate_hedged_takes_first_success_and_cancels_the_other():
+    ai = _provider("")
+    ai._hedge_after = 0.05
+    calls: list[int] = []
+    cancelled: list[int] = []
+
+    async def fake_generate(*args, **kwargs):
+        n = len(calls)
+        calls.append(n)
+        try:
+            await asyncio.sleep(1.0 if n == 0 else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(n)
+            raise
+        return f"answer {n}"
+
+    ai.generate = fake_generate
+    assert asyncio.run(ai.generate_hedged("system", "user")) == "answer 1"
+    assert calls == [0, 1]
+    assert cancelled == [0]
+
+
+def test_generate_hedged_falls_back_when_one_attempt_fails():
+    ai = _provider("")
+    ai._hedge_after = 0.01
+    calls: list[int] = []
+
+    async def fake_generate(*args, **kwargs):
+        n = len(calls)
+        calls.append(n)
+        await asyncio.sleep(0.05)
+        if n == 0:
+            raise RuntimeError("provider stalled")
+        return "recovered"
+
+    ai.generate = fake_generate
+    assert asyncio.run(ai.generate_hedged("system", "user")) == "recovered"
+
+    ai._hedge_after = 0
+    calls.clear()
+    with pytest.raises(RuntimeError):
+        asyncio.run(ai.generate_hedged("system", "user"))
+    assert calls == [0]
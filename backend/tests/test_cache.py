@@ -0,0 +1,90 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.core.cache import DiskCache, TTLCache
+
+
+def test_get_or_set_collapses_concurrent_misses():
+    cache: TTLCache[str] = TTLCache(maxsize=4, ttl=60)
+    calls = 0
+
+    async def fetch() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run() -> list[str]:
+        return await asyncio.gather(*(cache.get_or_set("k", fetch) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["value"] * 5
+    assert calls == 1
+    assert cache.get("k") == "value"
+
+
+def test_failures_are_not_cached():
+    cache: TTLCache[str] = TTLCache(maxsize=4, ttl=60)
+
+    async def boom() -> str:
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_set("k", boom))
+    assert cache.get("k") is None
+
+
+def test_entries_expire_and_evict_lru():
+    cache: TTLCache[int] = TTLCache(maxsize=2, ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_disk_cache_sweep_drops_expired_and_caps_entries(tmp_path):
+    cache = DiskCache(tmp_path, ttl=60, max_entries=3)
+    stale = tmp_path / "stale"
+    stale.write_bytes(b"old")
+    os.utime(stale, (time.time() - 120, time.time() - 120))
+
+    for i in range(5):
+        path = cache._path(f"k{i}")
+        path.write_bytes(b"v")
+        os.utime(path, (time.time() - 10 + i, time.time() - 10 + i))  # k0 is oldest
+    cache.sweep()
+
+    assert not stale.exists()
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        cache._path(f"k{i}").name for i in (2, 3, 4)
+    )
+
+
+def test_disk_cache_first_write_sweeps_leftovers(tmp_path):
+    stale = tmp_path / "leftover"
+    stale.write_bytes(b"old")
+    os.utime(stale, (time.time() - 120, time.time() - 120))
+
+    cache = DiskCache(tmp_path, ttl=60)
+    cache.set("key", b"value")
+    assert not stale.exists()
+    assert cache.get("key") == b"value"
+
+
+def test_disk_cache_sweeps_once_per_64_writes_across_threads(tmp_path, monkeypatch):
+    cache = DiskCache(tmp_path, ttl=60)
+    sweeps: list[int] = []
+    monkeypatch.setattr(cache, "sweep", lambda: sweeps.append(1))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: cache.set(f"k{i}", b"v"), range(4 * DiskCache._SWEEP_EVERY)))
+    assert len(sweeps) == 4
@@ -0,0 +1,42 @@
+import asyncio
+
+from backend.core.solodit_client import Finding, SearchResult
+from backend.modules.dictionary import DictionaryModule
+
+
+class _FakeClient:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def search(self, **kwargs) -> SearchResult:
+        self.calls += 1
+        finding = Finding(
+            title="Reentrancy in withdraw", impact="HIGH", content="", firm_name="Cyfrin",
+            protocol_name="Vaulty", quality_score=4, source_link="", github_link="",
+            tags=[], slug="reentrancy-in-withdraw",
+        )
+        return SearchResult(findings=[finding], total=1, page=kwargs["page"], total_pages=1)
+
+
+class _FakeAI:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def generate(self, **kwargs) -> str:
+        self.calls += 1
+        return "summary"
+
+
+def test_repeated_lookups_reuse_search_and_summary():
+    client, ai = _FakeClient(), _FakeAI()
+    module = DictionaryModule(client=client, ai=ai)
+
+    async def run() -> None:
+        await module.search("Reentrancy ", severity=["MEDIUM", "HIGH"], with_summary=True)
+        again = await module.search("reentrancy", with_summary=True)
+        assert again.ai_summary == "summary"
+        await module.search("reentrancy", page=2)
+
+    asyncio.run(run())
+    assert client.calls == 2
+    assert ai.calls == 1
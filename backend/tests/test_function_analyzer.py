@@ -0,0 +1,72 @@
+import re
+
+from backend.core.function_analyzer import (
+    FUNCTION_TYPE_PATTERNS,
+    PROTOCOL_TYPE_PATTERNS,
+    RISK_PATTERNS,
+    FunctionAnalyzer,
+)
+
+SAMPLE = """
+contract RewardVault is Ownable {
+    mapping(address => uint256) public balances;
+
+    function claimRewards(address user) external onlyOwner returns (uint256) {
+        uint256 owed = balances[user] * rewardRate / 1e18;
+        balances[user] = 0;
+        (bool success, ) = user.call{value: owed}("");
+        token.transfer(user, owed);
+        return owed;
+    }
+}
+"""
+
+
+def _first_match(patterns: dict[str, str], code: str) -> str:
+    for pattern, value in patterns.items():
+        if re.search(pattern, code, re.IGNORECASE):
+            return value
+    return ""
+
+
+def test_analyze_matches_case_insensitive_registry_semantics():
+    for code in (SAMPLE, SAMPLE.upper(), "function SWAP() { ORACLE.getPrice(); }"):
+        ctx = FunctionAnalyzer().analyze(code)
+        assert ctx.function_type == _first_match(FUNCTION_TYPE_PATTERNS, code)
+        assert ctx.protocol_type == _first_match(PROTOCOL_TYPE_PATTERNS, code)
+        expected_risks = [
+            tag for pattern, (tag, _) in RISK_PATTERNS.items()
+            if re.search(pattern, code, re.IGNORECASE)
+        ]
+        assert ctx.risk_patterns == expected_risks
+
+
+def test_analyze_extracts_name_and_external_calls():
+    ctx = FunctionAnalyzer().analyze(SAMPLE)
+    assert ctx.function_name == "claimRewards"
+    assert "token.transfer" in ctx.external_calls
+    assert not any(call.startswith("msg.") for call in ctx.external_calls)
+    assert "Reentrancy" in ctx.risk_patterns
+
+
+def test_state_changes_are_first_distinct_targets_in_source_order():
+    code = "a = 1; b += 2; a = 3; c -= 1; d = 0; e *= 2; f = 9;"
+    assert FunctionAnalyzer().analyze(code).state_changes == ["a", "b", "c", "d", "e"]
+
+
+def test_large_inputs_classify_from_head_and_tail_but_scan_risks_everywhere():
+    filler = "    uint256 x;\n" * 1000
+    code = "function swapTokens() external {\n" + filler + "    ecrecover(h, v, r, s);\n" + filler
+    ctx = FunctionAnalyzer().analyze(code)
+    assert ctx.function_type == "swap"
+    assert "Signature" in ctx.risk_patterns
+
+
+def test_analyze_cached_returns_independent_copies():
+    analyzer = FunctionAnalyzer()
+    first = analyzer.analyze_cached(SAMPLE)
+    first.risk_patterns.append("Injected")
+    first.protocol_type = "Bridge"
+
+    second = analyzer.analyze_cached(SAMPLE)
+    assert second.to_dict() == analyzer.analyze(SAMPLE).to_dict()
@@ -0,0 +1,13 @@
+from backend.core.html import fill_empty_code, strip_inline_styles
+
+
+def test_strip_inline_styles_handles_both_quote_forms():
+    html = """<p style="color:#000">a</p><span STYLE='x'>b</span><div data-style="y">c</div>"""
+    assert strip_inline_styles(html) == '<p>a</p><span>b</span><div data-style="y">c</div>'
+
+
+def test_fill_empty_code_only_replaces_blank_blocks():
+    html = '<pre class="x"><code>\n  </code></pre><pre><code>x = 1</code></pre>'
+    assert fill_empty_code(html, "// n/a") == (
+        "<pre><code>// n/a</code></pre><pre><code>x = 1</code></pre>"
+    )
@@ -1,3 +1,4 @@
+from backend.core.solodit_client import Finding
 from backend.modules.learning import LearningModule
 
 
@@ -51,3 +52,41 @@ def test_parse_quiz_handles_malformed_html_without_crashing():
     parsed = LearningModule._parse_quiz(malformed)
     assert isinstance(parsed, list)
 
+
+
+def test_process_lesson_html_normalizes_quiz_index_once():
+    html = """
+    <div class="quiz-question" data-correct="2">
+      <p>Which line is unsafe?</p>
+      <div class="quiz-option">A. foo</div>
+      <div class="quiz-option">B. bar</div>
+      <div class="quiz-option">C. baz</div>
+    </div>
+    """
+    out, quiz = LearningModule._process_lesson_html(html)
+    assert 'data-correct="1"' in out
+    assert len(quiz) == 1
+    assert quiz[0].correct_index == 1
+    assert quiz[0].question == "Which line is unsafe?"
+
+
+def test_last_quiz_question_survives_trailing_content():
+    question = (
+        '<div class="quiz-question" data-correct="1"><p>Q</p>'
+        '<div class="quiz-option">A</div><div class="quiz-option">B</div></div>\n'
+    )
+    html = question + question + "<h3>Wrap-up</h3><p>Keep practising.</p>"
+    out, quiz = LearningModule._process_lesson_html(html)
+    assert len(quiz) == 2
+    assert out.count('data-correct="0"') == 2
+
+
+def test_build_context_renders_fractional_quality_as_stars():
+    finding = Finding(
+        title="Reentrancy", impact="HIGH", content="body", firm_name="Cyfrin",
+        protocol_name="Vaulty", quality_score=4.6, source_link="", github_link="",
+        tags=["Reentrancy"], slug="reentrancy",
+    )
+    context = LearningModule._build_context([finding, finding])
+    assert "- **Quality:** ★★★★\n" in context
+    assert context.count("\n---\n") == 1
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+import backend.server as server
+from backend.core.pitfall_search import PitfallSearch, _selection_name, relevance_score
+
+SURROUNDING = """
+contract Vault {
+    mapping(address => uint256) public balances;
+    function withdraw(uint256 amount) external {
+        (bool ok, ) = msg.sender.call{value: amount}("");
+        balances[msg.sender] -= amount;
+    }
+}
+"""
+
+
+@pytest.fixture
+def client(fake_solodit, make_finding):
+    async def respond(keywords: str, **kwargs):
+        # Later queries answer first; merge order must not depend on it
+        await asyncio.sleep(0.05 / len(fake.calls))
+        if keywords == "withdraw vulnerability":
+            raise RuntimeError("boom")
+        return [
+            make_finding("Unrelated rounding", "MEDIUM"),
+            make_finding(f"{keywords} reentrancy"),
+        ]
+
+    fake = fake_solodit(respond)
+    return fake
+
+
+def test_search_and_score_ranks_dedups_and_shares_cache_across_calls(client):
+    search = PitfallSearch(client=client)
+
+    async def run():
+        first = await search.search_and_score("withdraw", SURROUNDING, top_k=5)
+        second = await search.search_and_score("withdraw", SURROUNDING, top_k=2)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first.sel_name == "withdraw"
+    assert first.query_used == "withdraw"
+    assert first.ctx.function_name == "withdraw"
+    assert "Reentrancy" in first.ctx.risk_patterns
+
+    titles = [f["title"] for f in first.findings]
+    assert titles[0] == "withdraw reentrancy"
+    assert titles.count("Unrelated rounding") == 1
+    assert "withdraw vulnerability reentrancy" not in titles
+
+    # The second call (e.g. /fix-draft after /pitfall) is served from cache;
+    # only the failed query, which is never cached, goes upstream again
+    repeated = [q for q in set(client.queries) if client.queries.count(q) > 1]
+    assert repeated == ["withdraw vulnerability"]
+    assert [f["title"] for f in second.findings] == titles[:2]
+
+
+def test_selection_name_and_relevance_score():
+    assert _selection_name("uint256 _withdraw(uint256 x)") == "withdraw"
+    assert _selection_name("  ") == ""
+
+    finding = {"title": "Withdraw reentrancy", "content": "x" * 5000 + "reentrancy",
+               "tags": [], "impact": "HIGH"}
+    # Title + haystack match for the name, one risk hit, HIGH severity
+    assert relevance_score(finding, sel="withdraw", risks=("reentrancy",)) == 80 + 30 + 20 + 8
+    balances = {"title": "Share accounting", "content": "", "tags": [], "impact": "LOW"}
+    assert relevance_score(balances, sel="balances", risks=()) == 35
+
+
+class _FakeAI:
+    async def generate_hedged(self, **kwargs) -> str:
+        return "<h3>Risk</h3>"
+
+
+def test_fix_draft_after_pitfall_is_served_from_cache(monkeypatch, fake_solodit):
+    client = fake_solodit()
+    monkeypatch.setattr(server, "_pitfall_search", PitfallSearch(client=client))
+    monkeypatch.setattr(server, "_ai", _FakeAI())
+    # Long enough to yield more candidate queries than either budget
+    selection = (
+        "function swap(uint256 amount) external {"
+        " (bool ok,) = msg.sender.call{value: amount}(''); oracle.getPrice(); }"
+    )
+
+    asyncio.run(server.pitfall(server.PitfallRequest(selection=selection)))
+    assert len(client.calls) == 6
+    assert {kwargs["page_size"] for _, kwargs in client.calls} == {4}
+
+    # /fix-draft's smaller budget is cut from the same cached searches
+    asyncio.run(server.fix_draft(server.FixDraftRequest(selection=selection)))
+    assert len(client.calls) == 6
+
+
+def test_search_and_score_trims_cached_results_to_the_callers_budget(
+    fake_solodit, make_finding
+):
+    async def respond(keywords: str, **kwargs):
+        return [make_finding(f"{keywords} #{i}") for i in range(kwargs["page_size"])]
+
+    client = fake_solodit(respond)
+    search = PitfallSearch(client=client)
+
+    async def run():
+        full = await search.search_and_score("withdraw", SURROUNDING, top_k=50)
+        small = await search.search_and_score(
+            "withdraw", SURROUNDING, top_k=50, max_queries=2, page_size=1
+        )
+        return full, small
+
+    full, small = asyncio.run(run())
+    assert len(full.findings) == 4 * len(client.calls)
+    titles = sorted(f["title"] for f in small.findings)
+    assert titles == ["withdraw #0", "withdraw vulnerability #0"]
+    assert len(client.calls) == len(set(client.queries))
@@ -0,0 +1,7 @@
+from backend.core.prompts import PromptTemplate
+
+
+def test_render_fills_placeholders_in_one_pass():
+    template = PromptTemplate("Topic: **{topic}**\nQuiz ({quiz_count} questions) {unknown}")
+    out = template.render(topic="{quiz_count} tricks", quiz_count=5)
+    assert out == "Topic: **{quiz_count} tricks**\nQuiz (5 questions) {unknown}"
@@ -0,0 +1,17 @@
+from backend.core.query_cluster import coalesce
+
+
+def test_coalesce_merges_near_duplicates_and_keeps_first_seen_order():
+    queries = [
+        "Oracle", "Reentrancy", "deposit vulnerability", "Oracle exploit",
+        "reentrancy", "ERC20 vulnerability", "ERC20 reentrancy",
+    ]
+    assert coalesce(queries) == [
+        "Oracle exploit", "Reentrancy", "deposit vulnerability",
+        "ERC20 vulnerability", "ERC20 reentrancy",
+    ]
+
+
+def test_coalesce_dedups_queries_without_content_tokens_by_exact_text():
+    queries = ["how to exploit", "Oracle", "HOW TO exploit", "!!", "!!", "what is"]
+    assert coalesce(queries) == ["how to exploit", "Oracle", "!!", "what is"]
@@ -0,0 +1,105 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.modules.scout import ScoutModule
+
+CONTRACT = """
+contract Vault is ERC4626 {
+    function deposit(uint256 assets) external {
+        (bool ok, ) = msg.sender.call{value: assets}("");
+        token.transferFrom(msg.sender, address(this), assets);
+        uint256 shares = convertToShares(assets);
+        uint256 price = oracle.getPrice();
+    }
+    function previewMint(uint256 s) public view returns (uint256) {}
+}
+"""
+
+
+@pytest.fixture
+def client(fake_solodit, make_finding):
+    """Fake Solodit that tracks search concurrency; "Oracle" fails, ERC* is slow."""
+    state = SimpleNamespace(active=0, peak=0, prefetched=[], completed=[])
+
+    async def respond(keywords: str, **kwargs):
+        if kwargs["quality_score"] == 1:
+            state.prefetched.append(keywords)
+            return []
+        state.active += 1
+        state.peak = max(state.peak, state.active)
+        await asyncio.sleep(0.5 if keywords.startswith("ERC") else 0.01)
+        state.active -= 1
+        state.completed.append(keywords)
+        if keywords == "Oracle":
+            raise RuntimeError("boom")
+        return [make_finding("shared"), make_finding(" SHARED "), make_finding(keywords)]
+
+    fake = fake_solodit(respond)
+    fake.state = state
+    return fake
+
+
+def _report_queries(client) -> list[str]:
+    # Prefetch searches (quality 1) are not part of the report's own queries
+    return [q for q, kwargs in client.calls if kwargs["quality_score"] != 1]
+
+
+class _FakeAI:
+    async def generate(self, **kwargs) -> str:
+        return "<h2>Report</h2>"
+
+
+def test_report_searches_run_concurrently_and_merge_in_query_order(client):
+    scout = ScoutModule(client=client, ai=_FakeAI())
+    report = asyncio.run(scout.generate_report(CONTRACT))
+
+    queries = _report_queries(client)
+    assert len(queries) > 4 and client.state.peak == 4
+    titles = [m["title"] for m in report.matched_findings]
+    assert titles == ["shared"] + [q for q in queries if q != "Oracle"]
+    assert client.state.prefetched == ["ERC4626"]
+    assert report.severity_breakdown == {"HIGH": len(titles), "MEDIUM": 0, "LOW": 0}
+    assert report.findings_count == len(titles)
+
+
+def test_report_stops_searching_once_it_has_enough_findings(client):
+    report = asyncio.run(ScoutModule(client=client, ai=_FakeAI()).generate_report(
+        CONTRACT, depth="quick"
+    ))
+    # The slow ERC search is the last query; enough findings arrive before it
+    assert "ERC4626 vulnerability" in _report_queries(client)
+    assert "ERC4626 vulnerability" not in client.state.completed
+    assert report.findings_count == 5
+
+
+def test_report_failure_cancels_prefetches_instead_of_waiting(fake_solodit, make_finding):
+    prefetch_cancelled = asyncio.Event()
+
+    async def respond(keywords: str, **kwargs):
+        if kwargs["quality_score"] == 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                prefetch_cancelled.set()
+                raise
+        return [make_finding(keywords)]
+
+    class _FailingAI:
+        async def generate(self, **kwargs) -> str:
+            await asyncio.sleep(0)  # let the prefetch start
+            raise RuntimeError("rate limited")
+
+    scout = ScoutModule(client=fake_solodit(respond), ai=_FailingAI())
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        with pytest.raises(RuntimeError, match="rate limited"):
+            await scout.generate_report(CONTRACT, depth="quick")
+        await asyncio.wait_for(prefetch_cancelled.wait(), 1)
+        return loop.time() - started
+
+    # Well under the prefetch grace period
+    assert asyncio.run(run()) < 1
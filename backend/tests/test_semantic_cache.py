@@ -0,0 +1,25 @@
+from backend.core.semantic_cache import SemanticCache
+
+
+def test_paraphrases_hit_within_scope_only():
+    cache: SemanticCache[str] = SemanticCache()
+    cache.set("reentrancy DEX", "standard", "lesson")
+
+    assert cache.get("DEX reentrancy bug", "standard") == "lesson"
+    assert cache.get("dex reentrancy vulnerabilities", "standard") == "lesson"
+    assert cache.get("DEX reentrancy bug", "deep") is None
+    assert cache.get("reentrancy", "standard") is None
+    assert cache.get("oracle manipulation", "standard") is None
+
+
+def test_entries_expire_and_evict():
+    cache: SemanticCache[int] = SemanticCache(maxsize=1, ttl=60)
+    cache.set("flash loan", None, 1)
+    cache.set("price oracle", None, 2)
+    assert cache.get("flash loans") is None
+    assert cache.get("oracle price") == 2
+
+    expired: SemanticCache[int] = SemanticCache(ttl=0)
+    expired.set("flash loan", None, 1)
+    assert expired.get("flash loan") is None
+    assert len(expired) == 0
@@ -0,0 +1,110 @@
+import asyncio
+
+import httpx
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+import backend.server as server
+from backend.core.ai_provider import RATE_LIMIT_ERRORS
+from backend.modules.learning import LearningModule
+
+
+async def _solodit_down(keywords: str, **kwargs):
+    raise RuntimeError("solodit down")
+
+
+class _FakeAI:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def generate(self, system_prompt, user_prompt, *, on_chunk=None, **kwargs) -> str:
+        self.calls += 1
+        parts = ["<h2>Lesson</h2>", "<p>body</p>"]
+        for part in parts:
+            await on_chunk(part)
+        return "".join(parts)
+
+
+def _events(client: TestClient, path: str, body: dict) -> list[dict]:
+    response = client.post(path, json=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [orjson.loads(line) for line in response.text.splitlines()]
+
+
+def test_learn_stream_sends_chunks_then_done_and_replays_cached_lessons(
+    monkeypatch, fake_solodit
+):
+    ai = _FakeAI()
+    monkeypatch.setattr(server, "_learning", LearningModule(client=fake_solodit(), ai=ai))
+    client = TestClient(server.app)
+
+    fresh = _events(client, "/learn/stream", {"topic": "reentrancy"})
+    assert [e["type"] for e in fresh] == ["chunk", "chunk", "done"]
+    assert "".join(e["text"] for e in fresh[:-1]) == "<h2>Lesson</h2><p>body</p>"
+    assert fresh[-1]["result"]["topic"] == "reentrancy"
+
+    # A paraphrase is served from the semantic cache: one chunk, then done
+    cached = _events(client, "/learn/stream", {"topic": "reentrancy attack"})
+    assert [e["type"] for e in cached] == ["chunk", "done"]
+    assert cached[0]["text"] == fresh[-1]["result"]["content_html"]
+    assert cached[-1]["result"]["topic"] == "reentrancy attack"
+    assert ai.calls == 1
+
+
+def test_stream_reports_failures_as_an_error_event(monkeypatch, fake_solodit):
+    monkeypatch.setattr(
+        server, "_learning", LearningModule(client=fake_solodit(_solodit_down), ai=_FakeAI())
+    )
+    client = TestClient(server.app)
+
+    events = _events(client, "/learn/stream", {"topic": "oracle"})
+    assert [e["type"] for e in events] == ["error"]
+    assert events[0]["status"] == 500
+    assert events[0]["detail"] == "Lesson generation failed: solodit down"
+
+
+def test_stream_errors_use_the_same_friendly_messages_as_the_endpoints(
+    monkeypatch, fake_solodit
+):
+    if not RATE_LIMIT_ERRORS:
+        pytest.skip("no AI SDK installed")
+    response = httpx.Response(429, request=httpx.Request("POST", "https://api.example"))
+    error = RATE_LIMIT_ERRORS[0]("quota exhausted for key sk-secret", response=response, body=None)
+
+    class _RateLimitedAI:
+        async def generate(self, *args, **kwargs) -> str:
+            raise error
+
+    monkeypatch.setattr(
+        server, "_learning", LearningModule(client=fake_solodit(), ai=_RateLimitedAI())
+    )
+    client = TestClient(server.app)
+
+    [event] = _events(client, "/learn/stream", {"topic": "oracle"})
+    assert event == {"type": "error", "status": 429, "detail": server._RATE_LIMIT_DETAIL}
+    # The non-streaming endpoint reports the same failure identically
+    response = client.post("/learn", json={"topic": "flash loan"})
+    assert (response.status_code, response.json()["detail"]) == (429, event["detail"])
+
+
+def test_ndjson_events_cancel_the_run_when_the_client_goes_away():
+    cancelled = asyncio.Event()
+
+    async def run(on_chunk):
+        await on_chunk("first")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def consume():
+        events = server._ndjson_events(run)
+        first = await events.__anext__()
+        await events.aclose()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        return orjson.loads(first)
+
+    assert asyncio.run(consume()) == {"type": "chunk", "text": "first"}
@@ -0,0 +1,13 @@
+from backend.core.function_analyzer import CodeContext
+from backend.core.smart_search import SmartSearch
+
+
+def test_apply_user_context_matches_hint_substrings_in_priority_order():
+    ctx = CodeContext(protocol_type="Oracle")
+    SmartSearch._apply_user_context(ctx, "ERC4626 vaults borrowing from Aave")
+    assert ctx.protocol_type == "Vault"
+    assert ctx.suggested_keywords == ["ERC4626", "vaults", "borrowing"]
+
+    ctx = CodeContext()
+    SmartSearch._apply_user_context(ctx, "unstake flow")
+    assert ctx.protocol_type == "Staking"
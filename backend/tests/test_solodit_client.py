@@ -0,0 +1,149 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from backend.core.cache import DiskCache
+from backend.core.solodit_client import Finding, SoloditClient, SoloditRateLimitError
+
+RAW_FINDING = {
+    "title": "Reentrancy in withdraw",
+    "impact": "HIGH",
+    "content": "State is updated after the external call.",
+    "firm_name": "Cyfrin",
+    "protocol_name": "Vaulty",
+    "quality_score": 4,
+    "source_link": "https://example.com/f1",
+    "github_link": "",
+    "slug": "reentrancy-in-withdraw",
+    "issues_issuetagscore": [
+        {"tags_tag": {"title": "Reentrancy"}},
+        {"tags_tag": {}},
+    ],
+}
+
+
+def _client(handler, disk_cache: DiskCache | None = None) -> SoloditClient:
+    client = SoloditClient(
+        api_key="test-key",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    client._disk_cache = disk_cache
+    return client
+
+
+def test_search_parses_findings_and_metadata():
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers["X-Cyfrin-API-Key"] == "test-key"
+        return httpx.Response(
+            200,
+            json={
+                "findings": [RAW_FINDING],
+                "metadata": {"totalResults": 1, "totalPages": 1},
+                "rateLimit": {"remaining": 9},
+            },
+        )
+
+    result = asyncio.run(_client(handler).search("reentrancy", page_size=1))
+    assert result.total == 1
+    assert result.rate_limit_remaining == 9
+    finding = result.findings[0]
+    assert finding.title == "Reentrancy in withdraw"
+    assert finding.tags == ["Reentrancy"]
+    assert Finding.from_api({**RAW_FINDING, "impact": "Medium"}).impact == "MEDIUM"
+    assert Finding.from_api({**RAW_FINDING, "impact": None}).impact == "UNKNOWN"
+    assert finding.to_dict()["slug"] == "reentrancy-in-withdraw"
+    assert finding.key == "reentrancy-in-withdraw"
+    assert Finding.from_api({**RAW_FINDING, "slug": ""}).key == "Reentrancy in withdraw"
+
+
+def test_search_retries_after_rate_limit():
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"findings": [RAW_FINDING], "metadata": {}})
+
+    result = asyncio.run(_client(handler).search("reentrancy"))
+    assert calls == 2
+    assert len(result.findings) == 1
+
+
+def test_search_raises_when_rate_limit_persists():
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(429, headers={"Retry-After": "0"})
+
+    with pytest.raises(SoloditRateLimitError):
+        asyncio.run(_client(handler).search("reentrancy"))
+    assert calls == 3
+
+
+def test_search_many_returns_results_by_query_and_skips_failures():
+    def handler(request: httpx.Request) -> httpx.Response:
+        keywords = json.loads(request.content)["filters"]["keywords"]
+        if keywords == "broken":
+            return httpx.Response(500)
+        return httpx.Response(200, json={"findings": [{**RAW_FINDING, "title": keywords}]})
+
+    batch = asyncio.run(_client(handler).search_many(["oracle", "broken", "reentrancy"]))
+    assert list(batch) == ["oracle", "reentrancy"]
+    assert batch["reentrancy"].findings[0].title == "reentrancy"
+
+
+def test_get_finding_returns_only_exact_slug_match():
+    other = {**RAW_FINDING, "slug": "reentrancy-in-withdraw-v2", "title": "Other"}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"findings": [other, RAW_FINDING]})
+
+    client = _client(handler)
+    finding = asyncio.run(client.get_finding("reentrancy-in-withdraw"))
+    assert finding is not None and finding.title == "Reentrancy in withdraw"
+    assert asyncio.run(_client(handler).get_finding("missing")) is None
+
+
+def test_search_is_served_from_disk_cache_across_clients(tmp_path):
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(
+            200,
+            json={"findings": [RAW_FINDING], "metadata": {}, "rateLimit": {"remaining": 0}},
+        )
+
+    cache = DiskCache(tmp_path, ttl=60)
+    first = asyncio.run(_client(handler, cache).search("reentrancy"))
+    second = asyncio.run(_client(handler, DiskCache(tmp_path, ttl=60)).search("reentrancy"))
+    assert calls == 1
+    assert second.findings[0].to_dict() == first.findings[0].to_dict()
+    assert second.rate_limit_remaining is None
+
+    asyncio.run(_client(handler, DiskCache(tmp_path, ttl=0)).search("reentrancy"))
+    assert calls == 2
+
+
+def test_injected_http_client_is_used_and_closed():
+    http = httpx.AsyncClient(
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"findings": [], "metadata": {}})
+        )
+    )
+    client = SoloditClient(api_key="test-key", client=http)
+    client._disk_cache = None
+
+    async def run():
+        await client.search("oracle")
+        await client.close()
+
+    asyncio.run(run())
+    assert http.is_closed